@@ -1,8 +1,60 @@
 from django.contrib import admin
-from django.contrib.auth.models import User
+from django.db import transaction
+
+from . import forecast, purge, rollups
+from .cache import bump_data_version
 from .models import Categories, Transaction
 
-# Register your models here.
+# Edits made here go through the same rollup, cache and soft-delete helpers
+# as the API, so summaries and cached responses stay in step.
+
+
+@admin.register(Categories)
+class CategoriesAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            bump_data_version(obj.user_id)
+            forecast.forget_user(obj.user_id)
+
+    def delete_model(self, request, obj):
+        purge.soft_delete(obj)
+
+    def delete_queryset(self, request, queryset):
+        for category in queryset:
+            purge.soft_delete(category)
+
+
+@admin.register(Transaction)
+class TransactionAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            before = None
+            if change:
+                before = rollups.snapshot(
+                    Transaction.all_objects.select_for_update(of=('self',)).get(pk=obj.pk)
+                )
+            super().save_model(request, obj, form, change)
+            if before is None:
+                rollups.record_created(obj)
+                user_ids = {obj.user_id}
+            else:
+                rollups.record_updated(before, obj)
+                user_ids = {before.user_id, obj.user_id}
+            for user_id in user_ids:
+                bump_data_version(user_id)
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Transaction.objects.filter(pk=obj.pk))
 
-admin.site.register(Categories)
-admin.site.register(Transaction)
\ No newline at end of file
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            delta = rollups.RollupDelta()
+            user_ids = set()
+            for txn in queryset.select_for_update(of=('self',)):
+                delta.remove_transaction(txn)
+                user_ids.add(txn.user_id)
+            queryset.delete()
+            delta.apply()
+            for user_id in user_ids:
+                bump_data_version(user_id)
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from .archive import remove_archive_file
+        from .authentication import evict_user
+        from .search import repair_sqlite_search
+
+        post_save.connect(evict_user, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(evict_user, sender=settings.AUTH_USER_MODEL)
+        post_migrate.connect(repair_sqlite_search, sender=self)
+        post_delete.connect(remove_archive_file, sender='api.ArchivedYear')
@@ -0,0 +1,399 @@
+import array
+import json
+import os
+import sys
+import threading
+import zipfile
+from collections import OrderedDict, defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+from .cache import bump_data_version
+from .models import ArchivedYear, Categories, Transaction
+
+FORMAT_VERSION = 1
+
+# One zip member per column. Integers are stored as little-endian arrays,
+# amounts as cents and dates as proleptic ordinals; detail is a blob of
+# UTF-8 text plus an array of byte lengths.
+INTEGER_COLUMNS = {
+    'id': 'q',
+    'category_id': 'q',
+    'amount': 'q',
+    'date': 'i',
+    'added_date': 'i',
+    'detail_length': 'i',
+}
+DETAIL_MEMBER = 'detail'
+META_MEMBER = 'meta.json'
+
+
+def archive_path(user_id, year, version):
+    return os.path.join(settings.TRANSACTION_ARCHIVE_DIR, str(user_id), f'{year}.v{version}.zip')
+
+
+def entry_path(entry):
+    return archive_path(entry.user_id, entry.year, entry.version)
+
+
+def encode_column(typecode, values):
+    column = array.array(typecode, values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+
+def decode_column(typecode, raw):
+    column = array.array(typecode)
+    column.frombytes(raw)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+
+class YearArchive:
+    """One user's archived transactions for one year, decoded into columns."""
+
+    def __init__(self, meta, columns, details):
+        self.meta = meta
+        self.ids = columns['id']
+        self.category_ids = columns['category_id']
+        self.amounts = columns['amount']
+        self.dates = columns['date']
+        self.added_dates = columns['added_date']
+        self.details = details
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rows(self):
+        """(id, category_id, amount, date, added_date, detail) tuples, newest first."""
+        for i in range(len(self.ids)):
+            yield (
+                self.ids[i],
+                self.category_ids[i],
+                Decimal(self.amounts[i]).scaleb(-2),
+                date.fromordinal(self.dates[i]),
+                date.fromordinal(self.added_dates[i]),
+                self.details[i],
+            )
+
+
+def month_totals(rows):
+    totals = defaultdict(lambda: [Decimal('0'), 0])
+    for _, category_id, amount, day, _, _ in rows:
+        entry = totals[(category_id, day.month)]
+        entry[0] += amount
+        entry[1] += 1
+    return [
+        [category_id, month, str(total), count]
+        for (category_id, month), (total, count) in sorted(totals.items())
+    ]
+
+
+def write_archive(path, user_id, year, rows):
+    """
+    Write ``rows`` (tuples as yielded by YearArchive.rows, newest first) to
+    ``path``. The per-(category, month) totals go into the metadata so
+    rollups can be rebuilt without decoding the columns.
+    """
+    details = [row[5].encode('utf-8') for row in rows]
+    members = {
+        'id': [row[0] for row in rows],
+        'category_id': [row[1] for row in rows],
+        'amount': [int(row[2] * 100) for row in rows],
+        'date': [row[3].toordinal() for row in rows],
+        'added_date': [row[4].toordinal() for row in rows],
+        'detail_length': [len(detail) for detail in details],
+    }
+    meta = {
+        'format': FORMAT_VERSION,
+        'user_id': user_id,
+        'year': year,
+        'rows': len(rows),
+        'totals': month_totals(rows),
+    }
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = path + '.tmp'
+    with zipfile.ZipFile(partial, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(META_MEMBER, json.dumps(meta))
+        for name, typecode in INTEGER_COLUMNS.items():
+            archive.writestr(name, encode_column(typecode, members[name]))
+        archive.writestr(DETAIL_MEMBER, b''.join(details))
+    os.replace(partial, path)
+
+
+def read_meta(path):
+    with zipfile.ZipFile(path) as archive:
+        return json.loads(archive.read(META_MEMBER))
+
+
+def decode_archive(path):
+    with zipfile.ZipFile(path) as archive:
+        meta = json.loads(archive.read(META_MEMBER))
+        if meta['format'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported archive format {meta['format']} in {path}")
+        columns = {
+            name: decode_column(typecode, archive.read(name))
+            for name, typecode in INTEGER_COLUMNS.items()
+        }
+        blob = archive.read(DETAIL_MEMBER)
+
+    details = []
+    offset = 0
+    for length in columns['detail_length']:
+        details.append(blob[offset:offset + length].decode('utf-8'))
+        offset += length
+    return YearArchive(meta, columns, details)
+
+
+class ArchiveCache:
+    """
+    Per-process LRU of decoded archives. Files are never rewritten in place
+    (a new version gets a new path), so entries need no invalidation.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        with self.lock:
+            archive = self.entries.get(path)
+            if archive is not None:
+                self.entries.move_to_end(path)
+                return archive
+        archive = decode_archive(path)
+        with self.lock:
+            self.entries[path] = archive
+            while len(self.entries) > settings.TRANSACTION_ARCHIVE_CACHE_SIZE:
+                self.entries.popitem(last=False)
+        return archive
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+archive_cache = ArchiveCache()
+
+
+def archived_years(user, date_range=None):
+    entries = ArchivedYear.objects.filter(user=user)
+    if date_range:
+        entries = entries.filter(year__range=(date_range[0].year, date_range[1].year))
+    return list(entries.order_by('-year'))
+
+
+def category_lookup(user):
+    return {
+        category_id: (name, category_type)
+        for category_id, name, category_type in
+        Categories.objects.filter(user=user).values_list('id', 'name', 'type')
+    }
+
+
+def read_rows(user, category_id=None, date_range=None, min_amount=None, max_amount=None):
+    """
+    The user's archived transactions matching the same filters as the list
+    endpoint, newest first, as dicts shaped like transaction_reader.values().
+    Queries run up front; rows are then built lazily, so a caller taking one
+    page only pays for that page. Rows whose category has since been
+    deleted are dropped, as the cascade would have dropped them from the
+    hot table.
+    """
+    entries = archived_years(user, date_range)
+    if not entries:
+        return iter(())
+    categories = category_lookup(user)
+    archives = [archive_cache.get(entry_path(entry)) for entry in entries]
+    return iter_rows(user.id, archives, categories, category_id, date_range, min_amount, max_amount)
+
+
+def iter_rows(user_id, archives, categories, category_id, date_range, min_amount, max_amount):
+    start = date_range[0].toordinal() if date_range else None
+    end = date_range[1].toordinal() if date_range else None
+    for archive in archives:
+        for i in range(len(archive)):
+            if category_id is not None and archive.category_ids[i] != category_id:
+                continue
+            if start is not None and not start <= archive.dates[i] <= end:
+                continue
+            category = categories.get(archive.category_ids[i])
+            if category is None:
+                continue
+            amount = Decimal(archive.amounts[i]).scaleb(-2)
+            if min_amount is not None and amount < min_amount:
+                continue
+            if max_amount is not None and amount > max_amount:
+                continue
+            yield {
+                'id': archive.ids[i],
+                'detail': archive.details[i],
+                'amount': amount,
+                'date': date.fromordinal(archive.dates[i]),
+                'added_date': date.fromordinal(archive.added_dates[i]),
+                'user': user_id,
+                'category__id': archive.category_ids[i],
+                'category__name': category[0],
+                'category__type': category[1],
+            }
+
+
+def month_bounds(year, month):
+    first = date(year, month, 1)
+    last = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return first, date.fromordinal(last.toordinal() - 1)
+
+
+def archived_totals(user, date_range):
+    """
+    Per-category (name, type, total, count) of the user's archived
+    transactions within ``date_range``. Months the range covers entirely
+    come from the precomputed totals; only the partial months at either
+    end decode the archive.
+    """
+    entries = archived_years(user, date_range)
+    if not entries:
+        return {}
+    categories = category_lookup(user)
+    start, end = date_range
+
+    totals = defaultdict(lambda: [Decimal('0'), 0])
+    for entry in entries:
+        partial = False
+        for category_id, month, total, count in read_meta(entry_path(entry))['totals']:
+            first, last = month_bounds(entry.year, month)
+            if start <= first and last <= end:
+                totals[category_id][0] += Decimal(total)
+                totals[category_id][1] += count
+            elif first <= end and start <= last:
+                partial = True
+        if not partial:
+            continue
+        for _, category_id, amount, day, _, _ in archive_cache.get(entry_path(entry)).rows():
+            first, last = month_bounds(day.year, day.month)
+            if start <= day <= end and not (start <= first and last <= end):
+                totals[category_id][0] += amount
+                totals[category_id][1] += 1
+
+    return {
+        category_id: (*categories[category_id], total, count)
+        for category_id, (total, count) in totals.items()
+        if category_id in categories
+    }
+
+
+def archived_rollups(user_ids=None):
+    """
+    Rollup rows contributed by archived transactions, keyed like
+    rollups.compute_rollups(), read from each archive's metadata.
+    """
+    entries = ArchivedYear.objects.all()
+    if user_ids:
+        entries = entries.filter(user_id__in=user_ids)
+    rollups = {}
+    for entry in entries:
+        for category_id, month, total, count in read_meta(entry_path(entry))['totals']:
+            rollups[(entry.user_id, category_id, entry.year, month)] = (Decimal(total), count)
+    existing = set(
+        Categories.objects.filter(id__in={key[1] for key in rollups}).values_list('id', flat=True)
+    )
+    return {key: value for key, value in rollups.items() if key[1] in existing}
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def remove_archive_file(sender, instance, **kwargs):
+    path = entry_path(instance)
+    transaction.on_commit(lambda: remove_file(path))
+
+
+def save_version(entry, rows):
+    """
+    Write ``rows`` as the entry's next version and point the entry at it.
+    Readers keep using the previous file, which is removed on commit, until
+    the surrounding transaction commits.
+    """
+    if entry.pk is not None:
+        old_path = entry_path(entry)
+        transaction.on_commit(lambda: remove_file(old_path))
+    entry.version += 1
+    entry.rows = len(rows)
+    path = entry_path(entry)
+    write_archive(path, entry.user_id, entry.year, rows)
+    try:
+        entry.save()
+    except Exception:
+        remove_file(path)
+        raise
+    return path
+
+
+def archive_year(user, year, before):
+    """
+    Move the user's transactions in ``year`` dated before ``before`` into
+    that year's archive, merging with rows archived earlier. Rollups are
+    left alone: archived rows still count towards them.
+    """
+    with transaction.atomic():
+        hot = Transaction.objects.select_for_update(of=('self',)).filter(
+            user=user, date__year=year, date__lt=before
+        )
+        moved = list(
+            hot.order_by('-date', '-id')
+            .values_list('id', 'category_id', 'amount', 'date', 'added_date', 'detail')
+        )
+        if not moved:
+            return 0
+
+        entry = ArchivedYear.objects.select_for_update().filter(user=user, year=year).first()
+        rows = moved
+        if entry is None:
+            entry = ArchivedYear(user=user, year=year, version=0)
+        else:
+            rows = sorted(
+                moved + list(archive_cache.get(entry_path(entry)).rows()),
+                key=lambda row: (row[3], row[0]),
+                reverse=True,
+            )
+
+        path = save_version(entry, rows)
+        try:
+            hot.delete()
+            bump_data_version(user.id)
+        except Exception:
+            remove_file(path)
+            raise
+    return len(moved)
+
+
+def reassign_category(user, source_id, target_id):
+    """
+    Point archived rows of one category at another, rewriting only the
+    years whose totals show rows for it. Runs inside the caller's
+    transaction.
+    """
+    for entry in ArchivedYear.objects.select_for_update().filter(user=user):
+        totals = read_meta(entry_path(entry))['totals']
+        if not any(category_id == source_id for category_id, *_ in totals):
+            continue
+        rows = [
+            (txn_id, target_id if category_id == source_id else category_id, *rest)
+            for txn_id, category_id, *rest in archive_cache.get(entry_path(entry)).rows()
+        ]
+        save_version(entry, rows)
+
+
+def archive_user(user, before):
+    years = Transaction.objects.filter(user=user, date__lt=before).dates('date', 'year')
+    return sum(archive_year(user, day.year, before) for day in years)
@@ -0,0 +1,98 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from rest_framework.views import APIView
+
+from .middleware import current_timer, install_timer
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers may be coroutines.
+
+    Authentication, permissions and any synchronous handler (the write
+    paths) run in the request's sync thread, so only the ``async def``
+    handlers execute on the event loop. Under WSGI Django wraps the view
+    with async_to_sync and it behaves like any other view.
+    """
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_QUERY_WORKERS,
+                thread_name_prefix='async-query',
+            )
+    return _executor
+
+
+def run_with_fresh_connection(func):
+    # Connections are per thread; workers outlive requests, so stale or
+    # broken ones are dropped the way the request cycle would.
+    close_old_connections()
+    timer = current_timer.get()
+    if timer is None:
+        return func()
+    with ExitStack() as stack:
+        install_timer(stack, timer)
+        return func()
+
+
+def in_atomic_block():
+    return connection.in_atomic_block
+
+
+async def gather_queries(*funcs):
+    """
+    Run independent, read-only query functions concurrently on worker
+    threads, each of which holds its own database connection. Inside an
+    atomic block other connections cannot see the pending writes, so the
+    functions run one after another on the request's connection instead.
+    Each runs in a copy of the caller's context, so database routing
+    decisions carry over.
+    """
+    if await sync_to_async(in_atomic_block)():
+        return [await sync_to_async(func)() for func in funcs]
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    return await asyncio.gather(*(
+        loop.run_in_executor(
+            executor, contextvars.copy_context().run, run_with_fresh_connection, func
+        )
+        for func in funcs
+    ))
@@ -0,0 +1,125 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    Thread-safe LRU of user objects whose entries expire after a TTL. Each
+    entry also records the user's auth version it was loaded under.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, version):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, entry_version, user = entry
+            if expires <= time.monotonic() or entry_version != version:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+        # Hand out copies so nothing a request does to its user leaks into
+        # the cache or into concurrent requests.
+        return copy.copy(user)
+
+    def set(self, key, version, user):
+        with self.lock:
+            expires = time.monotonic() + settings.AUTH_USER_CACHE_TTL
+            self.entries[key] = (expires, version, copy.copy(user))
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.AUTH_USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+def auth_version_key(user_id):
+    return f'auth-user-version:{user_id}'
+
+
+def get_auth_version(user_id):
+    key = auth_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_auth_version(user_id):
+    """Make every process reload the user once the current transaction commits."""
+    def bump():
+        key = auth_version_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def evict_user(sender, instance, **kwargs):
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    user_cache.delete(user_id)
+    bump_auth_version(user_id)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through a per-process
+    cache, so an authenticated request costs no query for identity. Saving
+    or deleting a user bumps its auth version in the shared cache, which
+    every hit is checked against, so all worker processes reload it.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        version = get_auth_version(user_id)
+        user = user_cache.get(user_id, version)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, version, user)
+            return user
+
+        self.check_user(user, validated_token)
+        return user
+
+    def check_user(self, user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
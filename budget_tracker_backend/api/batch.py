@@ -0,0 +1,168 @@
+from django.db import transaction
+from rest_framework import serializers
+
+from .fast_serializers import transaction_reader
+from .imports import amount_field, date_field
+from .models import Categories, Transaction
+from .rollups import RollupDelta
+
+MAX_BATCH_OPERATIONS = 1000
+OPERATIONS = ('create', 'update', 'delete')
+UPDATE_FIELDS = ['amount', 'date', 'detail', 'category']
+
+detail_field = serializers.CharField(allow_blank=True)
+id_field = serializers.IntegerField(min_value=1)
+
+
+class BatchError(Exception):
+    pass
+
+
+def validate_data(data, partial):
+    if not isinstance(data, dict):
+        return None, {'data': ['Expected an object.']}
+
+    values = {}
+    errors = {}
+    for name, field in (
+        ('amount', amount_field),
+        ('date', date_field),
+        ('detail', detail_field),
+        ('category_id', id_field),
+    ):
+        if name not in data:
+            if not partial and name != 'detail':
+                errors[name] = ['This field is required.']
+            continue
+        try:
+            values[name] = field.run_validation(data[name])
+        except serializers.ValidationError as exc:
+            errors[name] = exc.detail
+    return values, errors
+
+
+def parse_operations(operations):
+    if not isinstance(operations, list) or not operations:
+        raise BatchError("operations must be a non-empty list")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise BatchError(f"A batch is limited to {MAX_BATCH_OPERATIONS} operations")
+
+    parsed = []
+    for operation in operations:
+        op = operation.get('op') if isinstance(operation, dict) else None
+        entry = {'op': op, 'id': None, 'values': {}, 'errors': {}}
+        parsed.append(entry)
+        if op not in OPERATIONS:
+            entry['errors']['op'] = [f"Must be one of {', '.join(OPERATIONS)}."]
+            continue
+        if op != 'create':
+            try:
+                entry['id'] = id_field.run_validation(operation.get('id'))
+            except serializers.ValidationError as exc:
+                entry['errors']['id'] = exc.detail
+        if op != 'delete':
+            entry['values'], errors = validate_data(operation.get('data'), partial=op == 'update')
+            entry['errors'].update(errors)
+    return parsed
+
+
+def check_references(user, parsed):
+    """
+    Resolve every referenced category and transaction with one query each,
+    flagging ids that do not belong to the user or appear twice.
+    """
+    category_ids = {e['values']['category_id'] for e in parsed if 'category_id' in e['values']}
+    owned_categories = set(
+        Categories.objects.filter(user=user, id__in=category_ids).values_list('id', flat=True)
+    )
+    target_ids = [e['id'] for e in parsed if e['id'] is not None]
+    existing = {
+        txn.id: txn
+        for txn in Transaction.all_objects.select_for_update(of=('self',)).filter(
+            user=user, id__in=target_ids, category__deleted_at__isnull=True
+        )
+    }
+
+    seen = set()
+    for entry in parsed:
+        category_id = entry['values'].get('category_id')
+        if category_id is not None and category_id not in owned_categories:
+            entry['errors']['category_id'] = [f'Invalid pk "{category_id}" - object does not exist.']
+        if entry['id'] is None:
+            continue
+        if entry['id'] not in existing:
+            entry['errors']['id'] = ['Transaction not found.']
+        elif entry['id'] in seen:
+            entry['errors']['id'] = ['Transaction appears in more than one operation.']
+        seen.add(entry['id'])
+    return existing
+
+
+def apply_batch(user, operations):
+    parsed = parse_operations(operations)
+    with transaction.atomic():
+        existing = check_references(user, parsed)
+        if any(entry['errors'] for entry in parsed):
+            results = [
+                {'index': index, 'op': entry['op'], 'status': 'error', 'errors': entry['errors']}
+                if entry['errors'] else
+                {'index': index, 'op': entry['op'], 'status': 'skipped'}
+                for index, entry in enumerate(parsed)
+            ]
+            return False, results
+
+        delta = RollupDelta()
+        created, updated, deleted = [], [], []
+        for entry in parsed:
+            values = entry['values']
+            if entry['op'] == 'create':
+                txn = Transaction(
+                    user=user,
+                    category_id=values['category_id'],
+                    amount=values['amount'],
+                    date=values['date'],
+                    detail=values.get('detail', ''),
+                )
+                created.append(txn)
+                delta.add_transaction(txn)
+            elif entry['op'] == 'update':
+                txn = existing[entry['id']]
+                delta.remove_transaction(txn)
+                for name, value in values.items():
+                    setattr(txn, name, value)
+                updated.append(txn)
+                delta.add_transaction(txn)
+            else:
+                txn = existing[entry['id']]
+                deleted.append(txn.id)
+                delta.remove_transaction(txn)
+
+        Transaction.objects.bulk_create(created)
+        if updated:
+            Transaction.objects.bulk_update(updated, UPDATE_FIELDS)
+        if deleted:
+            Transaction.objects.filter(user=user, id__in=deleted).delete()
+        delta.apply()
+
+        # Read back before committing: afterwards a concurrent delete could
+        # remove rows this batch did write.
+        written_ids = [txn.id for txn in created + updated]
+        rows = {
+            row['id']: row
+            for row in transaction_reader.read(
+                Transaction.all_objects.filter(user=user, id__in=written_ids)
+            )
+        }
+
+    results = []
+    created_iter = iter(created)
+    for index, entry in enumerate(parsed):
+        result = {'index': index, 'op': entry['op']}
+        if entry['op'] == 'create':
+            result.update(status='created', data=rows[next(created_iter).id])
+        elif entry['op'] == 'update':
+            result.update(status='updated', data=rows[entry['id']])
+        else:
+            result.update(status='deleted', id=entry['id'])
+        results.append(result)
+    return True, results
@@ -0,0 +1,138 @@
+import functools
+import hashlib
+import inspect
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .routers import pin_to_primary
+
+
+def version_key(user_id):
+    return f'user-data-version:{user_id}'
+
+
+def get_data_version(user_id):
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock rather than 1 so an evicted counter can never
+        # come back at a value that older cached entries were stored under.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_data_version(user_id):
+    key = version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_data_version(user_id):
+    """
+    Invalidate every cached response for the user once the current
+    transaction commits, so readers never re-cache pre-commit data under
+    the new version. The user's reads are also pinned to the primary
+    database until a replica has caught up.
+    """
+    pin_to_primary(user_id)
+
+    def bump():
+        key = version_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def canonical_query(request):
+    return urlencode(sorted(request.query_params.lists()), doseq=True)
+
+
+def user_data_key(request, name, version):
+    return f'user-data:{name}:{request.user.id}:{version}:{canonical_query(request)}'
+
+
+def cached_user_data(request, name, build):
+    key = user_data_key(request, name, get_data_version(request.user.id))
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, settings.USER_DATA_CACHE_TIMEOUT)
+    return data
+
+
+async def acached_user_data(request, name, build):
+    key = user_data_key(request, name, await aget_data_version(request.user.id))
+    data = await cache.aget(key)
+    if data is None:
+        data = await build()
+        await cache.aset(key, data, settings.USER_DATA_CACHE_TIMEOUT)
+    return data
+
+
+def data_etag(request, name, version):
+    media_type = getattr(request, 'accepted_media_type', '')
+    raw = f'{name}:{request.user.id}:{version}:{media_type}:{canonical_query(request)}'
+    return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+
+def is_not_modified(request, etag):
+    # Weak comparison: compression middleware marks the ETag it sends as weak.
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    return etag in {tag.removeprefix('W/') for tag in if_none_match} or '*' in if_none_match
+
+
+def tag_response(response, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def etag_from_data_version(name):
+    """
+    Tag a GET handler's response with an ETag derived from the user's data
+    version, answering a matching If-None-Match with 304 before the handler
+    runs any query or serializer. Works on sync and async handlers.
+    ``name`` may be a callable, for responses that also depend on something
+    other than the data, such as today's date.
+    """
+    def label():
+        return name() if callable(name) else name
+
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                etag = data_etag(request, label(), await aget_data_version(request.user.id))
+                if is_not_modified(request, etag):
+                    return tag_response(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+                response = await method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                return tag_response(response, etag)
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            etag = data_etag(request, label(), get_data_version(request.user.id))
+            if is_not_modified(request, etag):
+                return tag_response(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+            response = method(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            return tag_response(response, etag)
+        return wrapper
+    return decorator
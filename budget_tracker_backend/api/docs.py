@@ -0,0 +1,74 @@
+import threading
+
+
+class Deferred:
+    """
+    A name in ``drf_yasg.openapi``, or a call to one, resolved only when
+    the schema is generated.
+    """
+
+    def __init__(self, name, args=None, kwargs=None):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self, *args, **kwargs):
+        return Deferred(self.name, args, kwargs)
+
+    def __repr__(self):
+        return f'openapi.{self.name}' + ('' if self.args is None else '(...)')
+
+    def resolve(self):
+        from drf_yasg import openapi as yasg_openapi
+
+        target = getattr(yasg_openapi, self.name)
+        if self.args is None:
+            return target
+        return target(*resolve(self.args), **resolve(self.kwargs))
+
+
+class DeferredNamespace:
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return Deferred(name)
+
+
+# Stands in for ``from drf_yasg import openapi`` in view modules.
+openapi = DeferredNamespace()
+
+
+def resolve(value):
+    if isinstance(value, Deferred):
+        return value.resolve()
+    if isinstance(value, dict):
+        return {key: resolve(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(resolve(item) for item in value)
+    return value
+
+
+pending = []
+pending_lock = threading.Lock()
+
+
+def swagger_auto_schema(**kwargs):
+    """
+    Record drf_yasg ``swagger_auto_schema`` arguments for a view method
+    without importing drf_yasg; ``attach_schema_metadata`` applies them.
+    """
+    def decorator(view_method):
+        with pending_lock:
+            pending.append((view_method, kwargs))
+        return view_method
+    return decorator
+
+
+def attach_schema_metadata():
+    """Apply every recorded decorator. Views must already be imported."""
+    from drf_yasg.utils import swagger_auto_schema as yasg_swagger_auto_schema
+
+    with pending_lock:
+        for view_method, kwargs in pending:
+            yasg_swagger_auto_schema(**resolve(kwargs))(view_method)
+        pending.clear()
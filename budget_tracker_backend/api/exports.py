@@ -0,0 +1,79 @@
+import csv
+import heapq
+import json
+from itertools import islice
+from operator import itemgetter
+
+from asgiref.sync import sync_to_async
+
+EXPORT_FIELDS = [
+    ('id', 'id'),
+    ('date', 'date'),
+    ('detail', 'detail'),
+    ('amount', 'amount'),
+    ('category_id', 'category_id'),
+    ('category', 'category__name'),
+    ('type', 'category__type'),
+    ('added_date', 'added_date'),
+]
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+# Archived rows are shaped like transaction_reader.values().
+ARCHIVED_COLUMNS = {'category_id': 'category__id'}
+
+
+def export_rows(transactions, archived=None):
+    columns = [column for _, column in EXPORT_FIELDS]
+    rows = (
+        transactions
+        .order_by('-date', '-id')
+        .values_list(*columns)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    if archived is None:
+        return rows
+    archived_rows = (
+        tuple(row[ARCHIVED_COLUMNS.get(column, column)] for column in columns)
+        for row in archived
+    )
+    return heapq.merge(
+        rows, archived_rows, key=itemgetter(columns.index('date'), columns.index('id')), reverse=True
+    )
+
+
+def stream_csv(transactions, archived=None):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in EXPORT_FIELDS])
+    for row in export_rows(transactions, archived):
+        yield writer.writerow(row)
+
+
+def stream_ndjson(transactions, archived=None):
+    names = [name for name, _ in EXPORT_FIELDS]
+    for row in export_rows(transactions, archived):
+        record = dict(zip(names, row))
+        record['amount'] = str(record['amount'])
+        record['date'] = record['date'].isoformat()
+        record['added_date'] = record['added_date'].isoformat()
+        yield json.dumps(record) + '\n'
+
+
+async def aiterate(chunks):
+    """
+    Hand a sync stream to an ASGI server EXPORT_CHUNK_SIZE pieces at a
+    time. Django would otherwise drain a sync iterator into one list before
+    sending it. Each batch is read in the sync thread, which owns the
+    database cursor.
+    """
+    read_batch = sync_to_async(lambda: list(islice(chunks, EXPORT_CHUNK_SIZE)))
+    while batch := await read_batch():
+        yield ''.join(batch)
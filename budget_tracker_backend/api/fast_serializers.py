@@ -0,0 +1,78 @@
+from rest_framework import serializers
+
+from .serializers import (
+    BudgetSerializer,
+    CategoriesSerializer,
+    CategoryBudgetSerializer,
+    TransactionSerializer,
+)
+
+# DB values for these field types already are what to_representation()
+# would return, so the read path passes them through untouched.
+PASSTHROUGH_FIELDS = (
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesReader:
+    """
+    Read-only fast path for a ModelSerializer.
+
+    The serializer's readable fields are compiled once into values() lookups
+    plus per-field converters, so a list response is built straight from
+    database rows without instantiating models or serializer fields per
+    row. Output matches ``serializer_class(many=True).data`` exactly;
+    writes keep going through the serializer itself.
+    """
+
+    def __init__(self, serializer_class):
+        self.columns = []
+        self.plan = self.compile(serializer_class(), prefix='')
+
+    def compile(self, serializer, prefix):
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.BaseSerializer):
+                plan.append((name, None, self.compile(field, f'{prefix}{field.source}__')))
+                continue
+            column = f'{prefix}{field.source}'
+            self.columns.append(column)
+            if type(field) in PASSTHROUGH_FIELDS:
+                convert = None
+            else:
+                convert = field.to_representation
+            plan.append((name, column, convert))
+        return plan
+
+    def build(self, row, plan):
+        item = {}
+        for name, column, convert in plan:
+            if column is None:
+                item[name] = self.build(row, convert)
+                continue
+            value = row[column]
+            item[name] = value if convert is None or value is None else convert(value)
+        return item
+
+    def values(self, queryset):
+        return queryset.values(*self.columns)
+
+    def to_representation(self, rows):
+        plan = self.plan
+        return [self.build(row, plan) for row in rows]
+
+    def read(self, queryset):
+        return self.to_representation(self.values(queryset))
+
+    async def aread(self, queryset):
+        return self.to_representation([row async for row in self.values(queryset)])
+
+
+transaction_reader = ValuesReader(TransactionSerializer)
+category_reader = ValuesReader(CategoriesSerializer)
+budget_reader = ValuesReader(BudgetSerializer)
+category_budget_reader = ValuesReader(CategoryBudgetSerializer)
@@ -0,0 +1,175 @@
+import calendar
+import time
+from array import array
+from datetime import date
+from itertools import accumulate
+from statistics import fmean
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+
+from . import archive
+from .models import Transaction
+
+
+def epoch_key(user_id):
+    return f'forecast-epoch:{user_id}'
+
+
+def month_key(user_id, year, month):
+    return f'forecast-month:{user_id}:{year}:{month}'
+
+
+def get_epoch(user_id):
+    key = epoch_key(user_id)
+    epoch = cache.get(key)
+    if epoch is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        epoch = cache.get(key)
+    return epoch
+
+
+def bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def curve_keys(user_id, months):
+    """
+    The cache key of each month's curve, under the user's epoch and the
+    month's own version.
+    """
+    epoch = get_epoch(user_id)
+    version_keys = {month_key(user_id, year, month): (year, month) for year, month in months}
+    versions = cache.get_many(list(version_keys))
+    for key in version_keys.keys() - versions.keys():
+        cache.add(key, time.time_ns(), timeout=None)
+        versions[key] = cache.get(key)
+    return {
+        (year, month): f'forecast-curve:{user_id}:{epoch}:{versions[key]}:{year}:{month}'
+        for key, (year, month) in version_keys.items()
+    }
+
+
+def forget_months(months):
+    """
+    Move the given (user_id, year, month) triples to a new version once the
+    current transaction commits; every other month stays cached. A curve
+    computed before the commit can still be written afterwards, but only
+    under the old version, which is never read again.
+    """
+    def forget():
+        for user_id, year, month in months:
+            bump(month_key(user_id, year, month))
+
+    if months:
+        transaction.on_commit(forget)
+
+
+def forget_user(user_id):
+    """Drop all of a user's curves, e.g. when a category changes type."""
+    transaction.on_commit(lambda: bump(epoch_key(user_id)))
+
+
+def month_days(year, month):
+    return calendar.monthrange(year, month)[1]
+
+
+def trailing_months(year, month, count):
+    months = []
+    for _ in range(count):
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+        months.append((year, month))
+    return months
+
+
+def compute_curves(user, months):
+    """
+    Cumulative expense by day of month for each of ``months``, from one
+    grouped query over the hot table plus any archived rows.
+    """
+    first, last = min(months), max(months)
+    date_range = (date(*first, 1), date(*last, month_days(*last)))
+    daily = {(year, month): array('d', [0.0] * month_days(year, month)) for year, month in months}
+
+    def add(day, amount):
+        values = daily.get((day.year, day.month))
+        if values is not None:
+            values[day.day - 1] += float(amount)
+
+    rows = (
+        Transaction.objects
+        .filter(user=user, category__type='expense', date__range=date_range)
+        .values('date')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+    for row in rows:
+        add(row['date'], row['total'])
+    for row in archive.read_rows(user, date_range=date_range):
+        if row['category__type'] == 'expense':
+            add(row['date'], row['amount'])
+
+    return {key: array('d', accumulate(values)) for key, values in daily.items()}
+
+
+def load_curves(user, months):
+    keys = curve_keys(user.id, months)
+    cached = cache.get_many(list(keys.values()))
+    curves = {month: cached[key] for month, key in keys.items() if key in cached}
+    missing = [key for key in months if key not in curves]
+    if missing:
+        computed = compute_curves(user, missing)
+        cache.set_many(
+            {keys[month]: curve for month, curve in computed.items()},
+            settings.FORECAST_CACHE_TIMEOUT,
+        )
+        curves.update(computed)
+    return [curves[key] for key in months]
+
+
+class Forecast:
+    """
+    Month-end expense projection from the user's trailing months.
+
+    Each trailing month is a cumulative day-of-month curve. The share of a
+    month's spending that is usually done by today is read off every curve
+    at the same fraction of the month and averaged; the rest of the
+    trailing average is then expected on top of what has been spent so far.
+    Without history the month-to-date run rate is extrapolated instead.
+    """
+
+    def __init__(self, curves):
+        self.curves = [curve for curve in curves if curve[-1] > 0]
+        self.average = fmean(curve[-1] for curve in self.curves) if self.curves else 0.0
+
+    def expected_share(self, fraction):
+        if not self.curves:
+            return fraction
+        return fmean(
+            curve[max(round(fraction * len(curve)) - 1, 0)] / curve[-1] for curve in self.curves
+        )
+
+    def project(self, year, month, spent, today):
+        spent = float(spent)
+        if (year, month) < (today.year, today.month):
+            return spent
+        if (year, month) > (today.year, today.month):
+            return max(spent, self.average)
+        fraction = today.day / month_days(year, month)
+        if not self.curves:
+            return spent / fraction
+        return spent + (1 - self.expected_share(fraction)) * self.average
+
+
+def needs_forecast(year, month, today):
+    return (year, month) >= (today.year, today.month)
+
+
+def load_forecast(user, today):
+    months = trailing_months(today.year, today.month, settings.FORECAST_TRAILING_MONTHS)
+    return Forecast(load_curves(user, months))
@@ -0,0 +1,102 @@
+import csv
+import io
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .models import Categories, Transaction
+from .rollups import RollupDelta
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+REQUIRED_COLUMNS = ('date', 'amount', 'category')
+
+# Stand-alone field instances give the same validation and messages as
+# TransactionSerializer without building a serializer per row.
+amount_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+date_field = serializers.DateField()
+
+
+class CSVImportError(Exception):
+    pass
+
+
+def category_lookup(user):
+    lookup = {}
+    for category_id, name in Categories.objects.filter(user=user).values_list('id', 'name'):
+        lookup[str(category_id)] = category_id
+        lookup.setdefault(name.strip().lower(), category_id)
+    return lookup
+
+
+def parse_row(row, categories, user):
+    errors = {}
+    values = {}
+    for name, field in (('amount', amount_field), ('date', date_field)):
+        try:
+            values[name] = field.run_validation((row.get(name) or '').strip())
+        except serializers.ValidationError as exc:
+            errors[name] = exc.detail
+
+    category = (row.get('category') or '').strip()
+    category_id = categories.get(category) or categories.get(category.lower())
+    if category_id is None:
+        errors['category'] = [f'Unknown category "{category}".']
+
+    if errors:
+        return None, errors
+    return Transaction(
+        user=user,
+        category_id=category_id,
+        amount=values['amount'],
+        date=values['date'],
+        detail=(row.get('detail') or '').strip(),
+    ), None
+
+
+def import_transactions(user, uploaded_file):
+    stream = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+    try:
+        return _import_rows(user, csv.DictReader(stream))
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise CSVImportError(f"Could not read CSV: {exc}")
+
+
+def _import_rows(user, reader):
+    columns = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise CSVImportError(f"Missing columns: {', '.join(missing)}")
+    reader.fieldnames = columns
+
+    categories = category_lookup(user)
+    delta = RollupDelta()
+    batch = []
+    created = 0
+    errors = []
+    error_count = 0
+
+    with transaction.atomic():
+        for row in reader:
+            txn, row_errors = parse_row(row, categories, user)
+            if row_errors:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'row': reader.line_num, 'errors': row_errors})
+                continue
+            batch.append(txn)
+            delta.add_transaction(txn)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                Transaction.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            Transaction.objects.bulk_create(batch)
+            created += len(batch)
+        delta.apply()
+
+    return {
+        'created': created,
+        'error_count': error_count,
+        'errors': errors,
+    }
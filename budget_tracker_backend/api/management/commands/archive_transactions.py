@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api import archive
+from api.models import Transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Move transactions dated before a cutoff out of the transactions table "
+        "into per-user, per-year compressed archive files"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', required=True, help="Cutoff date (YYYY-MM-DD), exclusive")
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help="Limit to a user id (may be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            before = datetime.strptime(options['before'], '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError("--before must be given as YYYY-MM-DD")
+
+        user_ids = Transaction.objects.filter(date__lt=before).values('user_id')
+        users = User.objects.filter(id__in=user_ids)
+        if options['user_ids']:
+            users = users.filter(id__in=options['user_ids'])
+
+        total = 0
+        for user in users.order_by('id'):
+            moved = archive.archive_user(user, before)
+            total += moved
+            self.stdout.write(f"user={user.id} archived {moved} transactions")
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} transactions"))
@@ -0,0 +1,201 @@
+import json
+import platform
+import re
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api import urls as api_urls
+from api.benchmarking import git_revision, percentile, throwaway_database
+from api.models import Budget, Transaction
+from api.seeding import Seeder
+
+PREFIX = '/api/v1/'
+
+# Written by RequestMetricsMiddleware, whose timer also sees the queries
+# that gather_queries runs on worker threads.
+TIMED_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every route in api/urls.py through the Django test client at "
+        "several data sizes, in a throwaway test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1000,10000,100000',
+            help="Comma-separated transaction counts for the benchmark user",
+        )
+        parser.add_argument('--repeat', type=int, default=20, help="Timed calls per endpoint")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help="Keep the response cache between calls instead of clearing it",
+        )
+        parser.add_argument('--output', help="Write JSON results to this path")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+
+        results = []
+        with throwaway_database():
+            for size in sizes:
+                results.extend(self.run_size(size, options))
+
+        report = {
+            'revision': git_revision(),
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'warm_cache': options['warm_cache'],
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def cases(self, user):
+        """
+        One or more requests per route. Routes that would grow the data set
+        between iterations (create, import, delete) are left out.
+        """
+        refresh = RefreshToken.for_user(user)
+        transaction_id = Transaction.objects.filter(user=user).values_list('id', flat=True).first()
+        category = user.categories_set.first()
+        budget = Budget.objects.filter(user=user).first()
+        today = datetime.now().date()
+        return {
+            'auth/login/': [
+                ('post', 'auth/login/', {'username': user.username, 'password': 'benchmark-pass-123'}),
+            ],
+            'auth/refresh/': [('post', 'auth/refresh/', {'refresh': str(refresh)})],
+            'categories/': [('get', 'categories/', None)],
+            'categories/<int:pk>/': [
+                ('put', f'categories/{category.id}/', {'name': category.name, 'type': category.type}),
+            ],
+            'transactions/': [
+                ('get', 'transactions/', None),
+                ('get', 'transactions/?limit=50', None),
+                ('get', f'transactions/?startDate={today.year}-01-01&endDate={today}', None),
+            ],
+            'transactions/<int:pk>/': [('get', f'transactions/{transaction_id}/', None)],
+            'transactions/summary/': [
+                ('get', 'transactions/summary/', None),
+                ('get', 'transactions/summary/?breakdown=category', None),
+            ],
+            'transactions/export/': [('get', 'transactions/export/', None)],
+            'transactions/timeseries/': [
+                ('get', 'transactions/timeseries/?interval=week&groupBy=category', None),
+            ],
+            'budgets/': [('get', 'budgets/', None)],
+            'budgets/<int:id>/': [('put', f'budgets/{budget.id}/', {'amount': str(budget.amount)})],
+            'budgets/summary/': [
+                ('get', f'budgets/summary/?month={today.month}&year={today.year}', None),
+                ('get', f'budgets/summary/?from={today.year - 1}-{today.month:02d}'
+                        f'&to={today.year}-{today.month:02d}', None),
+            ],
+            'budgets/forecast/': [
+                ('get', f'budgets/forecast/?month={today.month}&year={today.year}', None),
+            ],
+            'category-budgets/': [
+                ('get', f'category-budgets/?month={today.month}&year={today.year}', None),
+            ],
+            'category-budgets/summary/': [
+                ('get', f'category-budgets/summary/?month={today.month}&year={today.year}', None),
+            ],
+        }
+
+    def run_size(self, size, options):
+        self.stdout.write(f"Seeding {size} transactions...")
+        seeder = Seeder(seed=options['seed'])
+        user = seeder.seed_user(f'bench_{size}', size)
+        access = str(RefreshToken.for_user(user).access_token)
+        client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=f'Bearer {access}')
+        cases = self.cases(user)
+
+        results = []
+        for pattern in api_urls.urlpatterns:
+            route = str(pattern.pattern)
+            if route not in cases:
+                results.append({'size': size, 'route': route, 'skipped': True})
+                self.stdout.write(f"  {route:<36} skipped")
+                continue
+            for method, path, body in cases[route]:
+                result = self.measure(client, method, PREFIX + path, body, options)
+                result.update({'size': size, 'route': route, 'method': method.upper(), 'path': path})
+                results.append(result)
+                self.stdout.write(
+                    f"  {method.upper():<4} {path:<60} {result['status']} p50={result['p50_ms']:8.2f}ms "
+                    f"p95={result['p95_ms']:8.2f}ms queries={result['queries']:<3} "
+                    f"peak={result['peak_kb']:9.1f}KiB bytes={result['bytes']}"
+                )
+        return results
+
+    def send(self, client, method, path, body):
+        if method == 'get':
+            return client.get(path)
+        return getattr(client, method)(path, body, content_type='application/json')
+
+    def read_body(self, response):
+        if response.streaming:
+            return sum(len(chunk) for chunk in response.streaming_content)
+        return len(response.content)
+
+    def call(self, client, method, path, body):
+        response = self.send(client, method, path, body)
+        return response, self.read_body(response)
+
+    def count_queries(self, client, method, path, body):
+        """
+        The queries the middleware timed, plus those a streamed body runs
+        as it is read, after the middleware has returned.
+        """
+        response = self.send(client, method, path, body)
+        timed = TIMED_QUERIES.search(response.get('Server-Timing', ''))
+        with CaptureQueriesContext(connection) as ctx:
+            self.read_body(response)
+        return (int(timed.group(1)) if timed else 0) + len(ctx.captured_queries)
+
+    def measure(self, client, method, path, body, options):
+        timings = []
+        for _ in range(options['repeat']):
+            if not options['warm_cache']:
+                cache.clear()
+            started = time.perf_counter()
+            response, body_size = self.call(client, method, path, body)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        if not options['warm_cache']:
+            cache.clear()
+        queries = self.count_queries(client, method, path, body)
+
+        if not options['warm_cache']:
+            cache.clear()
+        tracemalloc.start()
+        try:
+            self.call(client, method, path, body)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'status': response.status_code,
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'queries': queries,
+            'peak_kb': round(peak / 1024, 1),
+            'bytes': body_size,
+        }
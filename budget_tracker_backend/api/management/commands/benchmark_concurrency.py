@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from asgiref.sync import ThreadSensitiveContext
+from django.core.management.base import BaseCommand
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.benchmarking import git_revision, percentile, throwaway_database
+from api.seeding import Seeder
+
+PREFIX = '/api/v1/'
+DUMMY_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput of the WSGI and ASGI request paths for the read "
+        "endpoints under concurrent load, in a throwaway test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=10000)
+        parser.add_argument(
+            '--concurrency',
+            default='1,8,32',
+            help="Comma-separated numbers of requests kept in flight",
+        )
+        parser.add_argument('--requests', type=int, default=200, help="Requests per run")
+        parser.add_argument(
+            '--db-latency-ms',
+            type=float,
+            default=0.0,
+            help="Delay added to every query, to emulate a database across the network",
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Write JSON results to this path")
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options['concurrency'].split(',') if level]
+
+        results = []
+        # The response cache would turn every run after the first into a
+        # cache benchmark, so it is disabled here.
+        with throwaway_database(), override_settings(CACHES=DUMMY_CACHE):
+            user = Seeder(seed=options['seed']).seed_user('bench_concurrency', options['transactions'])
+            headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+            paths = self.paths()
+
+            latency = options['db_latency_ms'] / 1000
+
+            def add_latency(sender, connection, **kwargs):
+                connection.execute_wrappers.append(delay_query(latency))
+
+            if latency:
+                connection_created.connect(add_latency)
+            try:
+                for level in levels:
+                    for mode, run in (('wsgi', self.run_wsgi), ('asgi', self.run_asgi)):
+                        result = self.measure(run, paths, headers, level, options['requests'])
+                        result.update({'mode': mode, 'concurrency': level})
+                        results.append(result)
+                        self.stdout.write(
+                            f"{mode} concurrency={level:<4} {result['rps']:8.1f} req/s "
+                            f"p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms "
+                            f"errors={result['errors']}"
+                        )
+            finally:
+                connection_created.disconnect(add_latency)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(
+                    {
+                        'revision': git_revision(),
+                        'transactions': options['transactions'],
+                        'db_latency_ms': options['db_latency_ms'],
+                        'results': results,
+                    },
+                    fh,
+                    indent=2,
+                )
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def paths(self):
+        today = date.today()
+        return [
+            PREFIX + path
+            for path in (
+                'categories/',
+                'transactions/?limit=50',
+                'transactions/summary/',
+                'transactions/summary/?breakdown=category',
+                'budgets/',
+                f'budgets/summary/?month={today.month}&year={today.year}',
+                f'budgets/summary/?from={today.year - 1}-{today.month:02d}'
+                f'&to={today.year}-{today.month:02d}',
+            )
+        ]
+
+    def measure(self, run, paths, headers, concurrency, count):
+        requests = [paths[i % len(paths)] for i in range(count)]
+        started = time.perf_counter()
+        timings, errors = run(requests, headers, concurrency)
+        elapsed = time.perf_counter() - started
+        return {
+            'rps': round(count / elapsed, 1),
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'errors': errors,
+        }
+
+    def run_wsgi(self, requests, headers, concurrency):
+        local = threading.local()
+
+        def call(path):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = Client(raise_request_exception=False, headers=headers)
+            started = time.perf_counter()
+            response = client.get(path)
+            return (time.perf_counter() - started) * 1000, response.status_code
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(call, requests))
+        return [t for t, _ in outcomes], sum(1 for _, code in outcomes if code != 200)
+
+    def run_asgi(self, requests, headers, concurrency):
+        async def run():
+            client = AsyncClient(raise_request_exception=False)
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def call(path):
+                async with semaphore:
+                    # ASGIHandler gives every request its own sync thread.
+                    async with ThreadSensitiveContext():
+                        started = time.perf_counter()
+                        response = await client.get(path, headers=headers)
+                        return (time.perf_counter() - started) * 1000, response.status_code
+
+            return await asyncio.gather(*(call(path) for path in requests))
+
+        outcomes = asyncio.run(run())
+        return [t for t, _ in outcomes], sum(1 for _, code in outcomes if code != 200)
+
+
+def delay_query(latency):
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(latency)
+        return execute(sql, params, many, context)
+    return wrapper
@@ -0,0 +1,131 @@
+import gzip
+import json
+import time
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.benchmarking import git_revision, percentile, throwaway_database
+from api.fast_serializers import transaction_reader
+from api.models import Transaction
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+from api.seeding import Seeder
+
+PATH = '/api/v1/transactions/'
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare render time and encoded size of the transaction list for each "
+        "renderer and content encoding, in a throwaway test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--output', help="Write JSON results to this path")
+
+    def handle(self, *args, **options):
+        renderers = [('json', JSONRenderer()), ('orjson', ORJSONRenderer())]
+        accepts = [('json', 'application/json')]
+        if find_spec('msgpack'):
+            renderers.append(('msgpack', MessagePackRenderer()))
+            accepts.append(('msgpack', 'application/msgpack'))
+        encoders = [('identity', None), ('gzip', compress_string)]
+        encodings = ['identity', 'gzip']
+        if find_spec('brotli'):
+            import brotli
+
+            encoders.append(('br', lambda body: brotli.compress(body, quality=settings.BROTLI_QUALITY)))
+            encodings.append('br')
+
+        with throwaway_database():
+            user = Seeder(seed=0).seed_user('bench_renderers', options['rows'])
+            data = transaction_reader.read(
+                Transaction.objects.filter(user=user).order_by('-date', '-id')
+            )
+
+            rendered = {}
+            for name, renderer in renderers:
+                body, timing = self.measure(lambda: renderer.render(data), options['repeat'])
+                rendered[name] = {'render_p50_ms': timing, 'bytes': {}}
+                for encoding, encode in encoders:
+                    encoded, timing = self.measure(
+                        lambda: encode(body) if encode else body, options['repeat']
+                    )
+                    rendered[name]['bytes'][encoding] = len(encoded)
+                    rendered[name][f'{encoding}_p50_ms'] = timing
+                self.stdout.write(
+                    f"render {name:<8} {rendered[name]['render_p50_ms']:8.2f}ms "
+                    + ' '.join(f"{enc}={size}B" for enc, size in rendered[name]['bytes'].items())
+                )
+            if json.loads(JSONRenderer().render(data)) != json.loads(ORJSONRenderer().render(data)):
+                self.stderr.write(self.style.ERROR("orjson output differs from JSONRenderer"))
+
+            client = Client(
+                headers={'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+            )
+            responses = []
+            for name, accept in accepts:
+                for encoding in encodings:
+                    responses.append(self.request(client, name, accept, encoding, options['repeat']))
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(
+                    {
+                        'revision': git_revision(),
+                        'rows': options['rows'],
+                        'renderers': rendered,
+                        'responses': responses,
+                    },
+                    fh,
+                    indent=2,
+                )
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def measure(self, build, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = build()
+            timings.append((time.perf_counter() - started) * 1000)
+        return result, round(percentile(timings, 0.50), 2)
+
+    def request(self, client, name, accept, encoding, repeat):
+        timings = []
+        renders = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.get(PATH, HTTP_ACCEPT=accept, HTTP_ACCEPT_ENCODING=encoding)
+            timings.append((time.perf_counter() - started) * 1000)
+            renders.append(server_timing(response, 'render'))
+        result = {
+            'renderer': name,
+            'encoding': response.get('Content-Encoding', 'identity'),
+            'bytes': len(response.content),
+            'p50_ms': round(percentile(timings, 0.50), 2),
+            'render_p50_ms': round(percentile(renders, 0.50), 2),
+        }
+        if result['encoding'] == 'gzip':
+            gzip.decompress(response.content)
+        self.stdout.write(
+            f"GET {name:<8} {result['encoding']:<9} {result['bytes']:>10}B "
+            f"p50={result['p50_ms']:.2f}ms render={result['render_p50_ms']:.2f}ms"
+        )
+        return result
+
+
+def server_timing(response, metric):
+    for entry in response.get('Server-Timing', '').split(','):
+        parts = entry.strip().split(';')
+        if parts[0] == metric:
+            for part in parts[1:]:
+                if part.startswith('dur='):
+                    return float(part[4:])
+    return 0.0
@@ -0,0 +1,62 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmarking import git_revision, percentile, throwaway_database
+from api.fast_serializers import transaction_reader
+from api.models import Transaction
+from api.seeding import Seeder
+from api.serializers import TransactionSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare TransactionSerializer with the values() read path for list responses"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--output', help="Write JSON results to this path")
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            user = Seeder(seed=0).seed_user('bench_serializers', options['rows'])
+            queryset = Transaction.objects.filter(user=user).order_by('-date', '-id')
+            renderer = JSONRenderer()
+
+            def serializer_path():
+                rows = queryset.select_related('category')
+                return renderer.render(TransactionSerializer(rows, many=True).data)
+
+            def fast_path():
+                return renderer.render(transaction_reader.read(queryset))
+
+            if serializer_path() != fast_path():
+                self.stderr.write(self.style.ERROR("Outputs differ"))
+
+            results = {}
+            for name, build in (('serializer', serializer_path), ('values', fast_path)):
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    build()
+                    timings.append((time.perf_counter() - started) * 1000)
+                results[name] = {
+                    'p50_ms': round(percentile(timings, 0.50), 2),
+                    'p95_ms': round(percentile(timings, 0.95), 2),
+                }
+                self.stdout.write(
+                    f"{name:<11} rows={options['rows']} p50={results[name]['p50_ms']:.2f}ms "
+                    f"p95={results[name]['p95_ms']:.2f}ms"
+                )
+
+        speedup = results['serializer']['p50_ms'] / results['values']['p50_ms']
+        self.stdout.write(self.style.SUCCESS(f"values() path is {speedup:.1f}x faster at p50"))
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(
+                    {'revision': git_revision(), 'rows': options['rows'], 'results': results},
+                    fh,
+                    indent=2,
+                )
@@ -0,0 +1,91 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarking import git_revision
+
+# Runs in a fresh interpreter, the way a worker starts: settings, then
+# django.setup(), then the URLconf and every view module behind it, which
+# a worker loads on its first request.
+WORKER = """
+import json, resource, sys, time
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+result = {}
+started = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+result['import_ms'] = (time.perf_counter() - started) * 1000
+result['import_rss_mb'] = rss_mb()
+
+started = time.perf_counter()
+django.setup()
+result['setup_ms'] = (time.perf_counter() - started) * 1000
+result['setup_rss_mb'] = rss_mb()
+
+started = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+result['urls_ms'] = (time.perf_counter() - started) * 1000
+result['rss_mb'] = rss_mb()
+
+result['modules'] = len(sys.modules)
+result['docs_loaded'] = 'drf_yasg.openapi' in sys.modules
+print(json.dumps(result))
+"""
+
+PHASES = ['import_ms', 'setup_ms', 'urls_ms', 'import_rss_mb', 'setup_rss_mb', 'rss_mb', 'modules']
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure a worker's cold start in fresh interpreters: settings import, "
+        "django.setup(), URLconf loading and resident memory"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--output', help="Write JSON results to this path")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ['DJANGO_SETTINGS_MODULE']}
+        runs = []
+        for _ in range(options['repeat']):
+            child = subprocess.run(
+                [sys.executable, '-c', WORKER],
+                capture_output=True, text=True, cwd=settings.BASE_DIR, env=env,
+            )
+            if child.returncode:
+                raise CommandError(child.stderr)
+            runs.append(json.loads(child.stdout.splitlines()[-1]))
+
+        results = {
+            phase: round(statistics.median(run[phase] for run in runs), 2) for phase in PHASES
+        }
+        results['total_ms'] = round(
+            statistics.median(run['import_ms'] + run['setup_ms'] + run['urls_ms'] for run in runs), 2
+        )
+        results['docs_loaded'] = any(run['docs_loaded'] for run in runs)
+        self.stdout.write(
+            f"import={results['import_ms']:.1f}ms setup={results['setup_ms']:.1f}ms "
+            f"urls={results['urls_ms']:.1f}ms total={results['total_ms']:.1f}ms "
+            f"rss={results['rss_mb']:.1f}MB modules={results['modules']} "
+            f"docs_loaded={results['docs_loaded']}"
+        )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(
+                    {'revision': git_revision(), 'repeat': options['repeat'], 'results': results},
+                    fh,
+                    indent=2,
+                )
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
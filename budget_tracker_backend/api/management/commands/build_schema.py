@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from api.schema import generate_schema, write_schema_files
+
+
+class Command(BaseCommand):
+    help = "Write the OpenAPI schema as JSON and YAML to OPENAPI_SCHEMA_DIR for the schema routes to serve"
+
+    def handle(self, *args, **options):
+        for path in write_schema_files(generate_schema()):
+            self.stdout.write(f"Wrote {path}")
+        self.stdout.write(self.style.SUCCESS("Schema built"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.purge import PURGE_BATCH_SIZE, purge_deleted
+
+
+class Command(BaseCommand):
+    help = "Remove deleted categories and their transactions in bounded batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=PURGE_BATCH_SIZE,
+            help="Transactions deleted per statement",
+        )
+
+    def handle(self, *args, **options):
+        categories, transactions = purge_deleted(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {categories} categories and {transactions} transactions"
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild or verify the monthly summary rollup table from raw and archived transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help="Compare the rollup table against raw transactions without writing",
+        )
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help="Limit to a user id (may be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+
+        if options['verify']:
+            mismatches = rollups.verify(user_ids)
+            for (user_id, category_id, year, month), expected, stored in mismatches:
+                self.stderr.write(
+                    f"user={user_id} category={category_id} {year}-{month:02d}: "
+                    f"expected={expected} stored={stored}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} rollup rows out of date")
+            self.stdout.write(self.style.SUCCESS("Rollups match transactions"))
+            return
+
+        count = rollups.rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} rollup rows"))
@@ -0,0 +1,165 @@
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS = {
+    'budget_request_duration_seconds': ("Total time spent handling the request", LATENCY_BUCKETS),
+    'budget_request_db_duration_seconds': ("Time spent executing SQL", LATENCY_BUCKETS),
+    'budget_request_db_queries': ("SQL queries executed per request", QUERY_BUCKETS),
+    'budget_request_render_duration_seconds': ("Time spent rendering the response body", LATENCY_BUCKETS),
+    'budget_response_size_bytes': ("Response body size", SIZE_BUCKETS),
+}
+
+
+class Histogram:
+    def __init__(self, buckets, counts=None, total=0.0):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; counts are per-slot, not cumulative.
+        self.counts = counts or [0] * (len(buckets) + 1)
+        self.sum = total
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.sum += value
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.last_flush = 0.0
+
+    def observe(self, labels, values):
+        with self.lock:
+            for name, value in values.items():
+                key = (name,) + labels
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(METRICS[name][1])
+                histogram.observe(value)
+        self.maybe_flush()
+
+    def dump(self):
+        with self.lock:
+            return [
+                {'key': list(key), 'counts': list(h.counts), 'sum': h.sum}
+                for key, h in self.histograms.items()
+            ]
+
+    def maybe_flush(self):
+        directory = settings.METRICS_MULTIPROC_DIR
+        if not directory:
+            return
+        now = time.monotonic()
+        if now - self.last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self.flush(directory)
+        self.last_flush = now
+
+    def flush(self, directory):
+        """
+        Write this process's histograms to its own file. Files are replaced
+        atomically, so a concurrent scrape never sees a partial write.
+        """
+        path = os.path.join(directory, f'metrics-{os.getpid()}.json')
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as fh:
+            json.dump(self.dump(), fh)
+        os.replace(temp_path, path)
+
+
+registry = Registry()
+
+
+def load_histograms(entries, into):
+    for entry in entries:
+        key = tuple(entry['key'])
+        if key[0] not in METRICS:
+            continue
+        histogram = Histogram(METRICS[key[0]][1], list(entry['counts']), entry['sum'])
+        if key in into:
+            into[key].merge(histogram)
+        else:
+            into[key] = histogram
+
+
+def collect():
+    """Histograms from every worker when multiprocess mode is on, else this one."""
+    histograms = {}
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        load_histograms(registry.dump(), histograms)
+        return histograms
+
+    registry.flush(directory)
+    for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+        try:
+            with open(path) as fh:
+                load_histograms(json.load(fh), histograms)
+        except (OSError, ValueError):
+            continue
+    return histograms
+
+
+def escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def format_bound(bound):
+    return repr(float(bound)) if isinstance(bound, float) else str(bound)
+
+
+def render_prometheus(histograms):
+    lines = []
+    for name, (description, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} histogram')
+        for key in sorted(k for k in histograms if k[0] == name):
+            _, view, method = key
+            histogram = histograms[key]
+            labels = f'view="{escape(view)}",method="{escape(method)}"'
+            cumulative = 0
+            for bound, count in zip(buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{format_bound(bound)}"}} {cumulative}')
+            cumulative += histogram.counts[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'{name}_count{{{labels}}} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Disabled (404) unless METRICS_TOKEN is set,
+    and then only served to requests presenting it as a bearer token.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    return HttpResponse(
+        render_prometheus(collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
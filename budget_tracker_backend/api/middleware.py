@@ -0,0 +1,207 @@
+import re
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .metrics import registry
+
+
+class QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.duration += elapsed
+                self.count += 1
+
+
+# The current request's timer, for queries it runs on worker threads
+# (see async_views.gather_queries).
+current_timer = ContextVar('current_timer', default=None)
+
+
+def install_timer(stack, timer):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(timer))
+
+
+class RequestMetricsMiddleware:
+    """
+    Times each request, the SQL it runs and the rendering of its body,
+    reports them in a Server-Timing header and feeds the per-view
+    histograms exposed at /metrics/.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer()
+        request.render_duration = 0.0
+        started = time.perf_counter()
+        token = current_timer.set(timer)
+        try:
+            with ExitStack() as stack:
+                install_timer(stack, timer)
+                response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.record(request, response, timer, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        request.render_duration = 0.0
+        started = time.perf_counter()
+        token = current_timer.set(timer)
+        try:
+            with ExitStack() as stack:
+                # Connections are per thread; the ORM runs in the request's
+                # sync thread, so the timer has to be attached there.
+                await sync_to_async(install_timer)(stack, timer)
+                response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.record(request, response, timer, time.perf_counter() - started)
+
+    def record(self, request, response, timer, total):
+        size = 0 if response.streaming else len(response.content)
+        render = request.render_duration
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries"',
+            f'render;dur={render * 1000:.1f}',
+        ])
+
+        match = request.resolver_match
+        view = (match.view_name or match.route) if match else 'unmatched'
+        registry.observe((view, request.method), {
+            'budget_request_duration_seconds': total,
+            'budget_request_db_duration_seconds': timer.duration,
+            'budget_request_db_queries': timer.count,
+            'budget_request_render_duration_seconds': render,
+            'budget_response_size_bytes': size,
+        })
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns.
+        started = time.perf_counter()
+
+        def rendered(response):
+            request.render_duration = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+ACCEPTS_BROTLI = re.compile(r'\bbr\b')
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+    for chunk in sequence:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def abrotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+    async for chunk in sequence:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def agzip_sequence(sequence, max_random_bytes):
+    async for chunk in sequence:
+        yield compress_string(chunk, max_random_bytes=max_random_bytes)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    GZipMiddleware that prefers Brotli when the client accepts it and the
+    brotli package is installed, and leaves responses shorter than
+    COMPRESSION_MIN_LENGTH alone.
+    """
+    max_random_bytes = 100
+
+    def choose_encoding(self, request):
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and ACCEPTS_BROTLI.search(accept):
+            return 'br'
+        if ACCEPTS_GZIP.search(accept):
+            return 'gzip'
+        return None
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_LENGTH:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.choose_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            content = response.streaming_content
+            if encoding == 'br':
+                wrap = abrotli_sequence if response.is_async else brotli_sequence
+                response.streaming_content = wrap(content)
+            elif response.is_async:
+                response.streaming_content = agzip_sequence(content, self.max_random_bytes)
+            else:
+                response.streaming_content = compress_sequence(
+                    content, max_random_bytes=self.max_random_bytes
+                )
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=settings.BROTLI_QUALITY)
+            else:
+                compressed = compress_string(
+                    response.content, max_random_bytes=self.max_random_bytes
+                )
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
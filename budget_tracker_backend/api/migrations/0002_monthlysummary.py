@@ -0,0 +1,53 @@
+# Generated by Django 5.2 on 2025-04-20 10:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def populate_monthly_summary(apps, schema_editor):
+    Transaction = apps.get_model('api', 'Transaction')
+    MonthlySummary = apps.get_model('api', 'MonthlySummary')
+    rows = (
+        Transaction.objects
+        .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+        .values('user_id', 'category_id', 'year', 'month')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    MonthlySummary.objects.bulk_create(
+        [MonthlySummary(**row) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.categories')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Monthly Summary',
+                'verbose_name_plural': 'Monthly Summaries',
+                'db_table': 'monthly_summary',
+                'constraints': [models.UniqueConstraint(fields=('user', 'category', 'year', 'month'), name='unique_monthly_summary')],
+            },
+        ),
+        migrations.RunPython(populate_monthly_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2 on 2025-04-20 11:05
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_budgets(apps, schema_editor):
+    # BudgetSummaryAPIView used .first(), i.e. the lowest id, so keep that row.
+    Budget = apps.get_model('api', 'Budget')
+    duplicates = (
+        Budget.objects
+        .values('user_id', 'year', 'month')
+        .annotate(keep_id=Min('id'), rows=Count('id'))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        Budget.objects.filter(
+            user_id=row['user_id'], year=row['year'], month=row['month']
+        ).exclude(id=row['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_monthlysummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='monthlysummary',
+            index=models.Index(fields=['user', 'year', 'month'], name='monthly_summary_user_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'date', 'id'], name='transactions_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'category', 'date'], name='transactions_user_cat_date_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_budgets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='budget',
+            constraint=models.UniqueConstraint(fields=('user', 'year', 'month'), name='unique_budget_per_month'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2025-04-20 14:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from api import search
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        Transaction = apps.get_model('api', 'Transaction')
+        schema_editor.add_index(Transaction, search.postgres_search_index())
+    elif vendor == 'sqlite':
+        search.install_sqlite_search(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        Transaction = apps.get_model('api', 'Transaction')
+        schema_editor.remove_index(Transaction, search.postgres_search_index())
+    elif vendor == 'sqlite':
+        search.remove_sqlite_search(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.CreateModel(
+            name='TransactionSearchEntry',
+            fields=[
+                ('transaction', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='api.transaction')),
+                ('document', models.TextField(db_column='transactions_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'transactions_search',
+                'managed': False,
+            },
+        ),
+    ]
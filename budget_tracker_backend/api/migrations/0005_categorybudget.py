@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2025-04-21 09:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_transaction_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryBudget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('month', models.IntegerField()),
+                ('year', models.IntegerField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.categories')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Category Budget',
+                'verbose_name_plural': 'Category Budgets',
+                'db_table': 'category_budget',
+                'indexes': [models.Index(fields=['user', 'year', 'month'], name='category_budget_user_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('category', 'year', 'month'), name='unique_category_budget_per_month')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2025-04-21 10:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_categorybudget'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedYear',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('version', models.IntegerField()),
+                ('rows', models.IntegerField()),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Year',
+                'verbose_name_plural': 'Archived Years',
+                'db_table': 'archived_year',
+                'constraints': [models.UniqueConstraint(fields=('user', 'year'), name='unique_archived_year')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2025-04-21 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_archivedyear'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categories',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,16 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+class ActiveCategoryManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class ActiveTransactionManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(category__deleted_at__isnull=True)
+
+
 class Categories(models.Model):
     CATEGORY_TYPE_CHOICES = [
         ('income', 'Income'),
@@ -9,6 +19,12 @@ class Categories(models.Model):
     name = models.CharField(max_length=100)
     type = models.CharField(max_length=10, choices=CATEGORY_TYPE_CHOICES)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Set when the category is deleted; it and its transactions stay hidden
+    # until the purge_categories command removes them.
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveCategoryManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.name
@@ -31,6 +47,36 @@ class Budget(models.Model):
         db_table = "budget"
         verbose_name = "Budget"
         verbose_name_plural = "Budgets"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'year', 'month'],
+                name='unique_budget_per_month',
+            ),
+        ]
+
+class CategoryBudget(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    category = models.ForeignKey(Categories, on_delete=models.CASCADE)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    month = models.IntegerField()
+    year = models.IntegerField()
+
+    def __str__(self):
+        return f"{self.category.name} - {self.month}/{self.year}"
+
+    class Meta:
+        db_table = "category_budget"
+        verbose_name = "Category Budget"
+        verbose_name_plural = "Category Budgets"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['category', 'year', 'month'],
+                name='unique_category_budget_per_month',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'year', 'month'], name='category_budget_user_month_idx'),
+        ]
 
 class Transaction(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -40,6 +86,9 @@ class Transaction(models.Model):
     date = models.DateField()
     added_date = models.DateField(auto_now_add=True)
 
+    objects = ActiveTransactionManager()
+    all_objects = models.Manager()
+
     def __str__(self):
         return f"{self.category.name} - {self.amount}"
     
@@ -48,3 +97,71 @@ class Transaction(models.Model):
         verbose_name = "Transaction Entry"
         verbose_name_plural = "Transactions"
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date', 'id'], name='transactions_user_date_idx'),
+            models.Index(fields=['user', 'category', 'date'], name='transactions_user_cat_date_idx'),
+        ]
+
+class MonthlySummary(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    category = models.ForeignKey(Categories, on_delete=models.CASCADE)
+    year = models.IntegerField()
+    month = models.IntegerField()
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.category.name} - {self.month}/{self.year}"
+
+    class Meta:
+        db_table = "monthly_summary"
+        verbose_name = "Monthly Summary"
+        verbose_name_plural = "Monthly Summaries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'category', 'year', 'month'],
+                name='unique_monthly_summary',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'year', 'month'], name='monthly_summary_user_month_idx'),
+        ]
+
+class ArchivedYear(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    year = models.IntegerField()
+    version = models.IntegerField()
+    rows = models.IntegerField()
+    archived_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.year} (v{self.version})"
+
+    class Meta:
+        db_table = "archived_year"
+        verbose_name = "Archived Year"
+        verbose_name_plural = "Archived Years"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'year'],
+                name='unique_archived_year',
+            ),
+        ]
+
+class TransactionSearchEntry(models.Model):
+    # Read-only view of the SQLite FTS5 table kept in sync by triggers; see
+    # api/search.py. It has no table on other databases.
+    transaction = models.OneToOneField(
+        Transaction,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_entry',
+    )
+    document = models.TextField(db_column='transactions_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "transactions_search"
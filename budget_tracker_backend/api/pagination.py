@@ -0,0 +1,137 @@
+import base64
+import heapq
+import itertools
+import json
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class TransactionCursorPagination:
+    """
+    Keyset pagination over (date, id), newest first.
+
+    The cursor encodes the boundary row of the current page, so every page
+    is a single indexed range scan no matter how deep the client has paged.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = 50
+    max_page_size = 500
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, archived=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        if position is None:
+            queryset = queryset.order_by('-date', '-id')
+        else:
+            boundary_date, boundary_id = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(date__gt=boundary_date) | Q(date=boundary_date, id__gt=boundary_id)
+                ).order_by('date', 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(date__lt=boundary_date) | Q(date=boundary_date, id__lt=boundary_id)
+                ).order_by('-date', '-id')
+
+        rows = list(queryset[:self.page_size + 1])
+        if archived is not None:
+            rows = self.merge_archived(rows, archived, position, reverse)
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.first = rows[0] if rows else None
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def merge_archived(self, rows, archived, position, reverse):
+        """
+        Merge archived rows (an iterable of dicts, newest first) into the
+        page read from the table, applying the same cursor boundary in Python.
+        """
+        def key(row):
+            return (row['date'], row['id'])
+
+        if reverse:
+            archived = [row for row in archived if key(row) > position][::-1]
+        elif position is not None:
+            archived = (row for row in archived if key(row) < position)
+        merged = heapq.merge(rows, archived, key=key, reverse=not reverse)
+        return list(itertools.islice(merged, self.page_size + 1))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self.build_link(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first is None:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self.build_link(self.first, reverse=True)
+
+    def build_link(self, row, reverse):
+        url = self.request.build_absolute_uri()
+        if isinstance(row, dict):
+            cursor = self.encode_cursor(row['date'], row['id'], reverse)
+        else:
+            cursor = self.encode_cursor(row.date, row.id, reverse)
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def encode_cursor(self, row_date, row_id, reverse):
+        payload = {'d': row_date.isoformat(), 'i': row_id}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode('ascii')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            position = (date.fromisoformat(payload['d']), int(payload['i']))
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise ValidationError({'cursor': 'Invalid cursor'})
+        return position, reverse
@@ -0,0 +1,62 @@
+from django.db import transaction
+from django.utils import timezone
+
+from . import archive, forecast, rollups
+from .cache import bump_data_version
+from .models import Categories, CategoryBudget, MonthlySummary, Transaction
+
+PURGE_BATCH_SIZE = 1000
+
+
+def soft_delete(category):
+    """
+    Hide a category and its transactions at once. Its rollup rows and
+    limits are small and go immediately; the transactions are left for
+    purge_deleted().
+    """
+    with transaction.atomic():
+        category.deleted_at = timezone.now()
+        category.save(update_fields=['deleted_at'])
+        MonthlySummary.objects.filter(category=category).delete()
+        CategoryBudget.objects.filter(category=category).delete()
+        bump_data_version(category.user_id)
+        forecast.forget_user(category.user_id)
+
+
+def reassign(category, target):
+    """
+    Move every transaction of ``category``, hot or archived, to ``target``
+    and delete ``category``. The hot rows move with a single UPDATE.
+    """
+    with transaction.atomic():
+        moved = Transaction.all_objects.filter(category=category).update(category=target)
+        rollups.move_category(category.user_id, category.id, target.id)
+        archive.reassign_category(category.user_id, category.id, target.id)
+        category.delete()
+        bump_data_version(category.user_id)
+        forecast.forget_user(category.user_id)
+    return moved
+
+
+def purge_deleted(batch_size=PURGE_BATCH_SIZE):
+    """
+    Remove soft-deleted categories. Their transactions are deleted by id in
+    batches of ``batch_size``, each a single DELETE in its own transaction,
+    so no step holds locks or memory for long. Returns the number of
+    categories and transactions removed.
+    """
+    categories = transactions = 0
+    for category in Categories.all_objects.filter(deleted_at__isnull=False).order_by('id'):
+        while True:
+            ids = list(
+                Transaction.all_objects.filter(category=category)
+                .order_by()
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            Transaction.all_objects.filter(id__in=ids).delete()
+            transactions += len(ids)
+        category.delete()
+        categories += 1
+    return categories, transactions
@@ -0,0 +1,204 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from . import forecast
+from .archive import archived_rollups
+from .cache import bump_data_version
+from .models import MonthlySummary, Transaction
+
+
+class RollupDelta:
+    """
+    Accumulates per-(user, category, year, month) changes so a write that
+    touches many transactions costs one UPDATE per affected month.
+    """
+
+    def __init__(self):
+        self.changes = defaultdict(lambda: [Decimal('0'), 0])
+
+    def add(self, user_id, category_id, day, amount):
+        entry = self.changes[(user_id, category_id, day.year, day.month)]
+        entry[0] += Decimal(amount)
+        entry[1] += 1
+
+    def remove(self, user_id, category_id, day, amount):
+        entry = self.changes[(user_id, category_id, day.year, day.month)]
+        entry[0] -= Decimal(amount)
+        entry[1] -= 1
+
+    def add_transaction(self, txn):
+        self.add(txn.user_id, txn.category_id, txn.date, txn.amount)
+
+    def remove_transaction(self, txn):
+        self.remove(txn.user_id, txn.category_id, txn.date, txn.amount)
+
+    def apply(self):
+        with transaction.atomic():
+            for key, (amount, count) in self.changes.items():
+                if amount or count:
+                    apply_change(key, amount, count)
+            forecast.forget_months({
+                (user_id, year, month) for user_id, _, year, month in self.changes
+            })
+        self.changes.clear()
+
+
+def apply_change(key, amount, count):
+    user_id, category_id, year, month = key
+    rows = MonthlySummary.objects.filter(
+        user_id=user_id, category_id=category_id, year=year, month=month
+    )
+    if rows.update(total=F('total') + amount, count=F('count') + count):
+        return
+    try:
+        with transaction.atomic():
+            MonthlySummary.objects.create(
+                user_id=user_id,
+                category_id=category_id,
+                year=year,
+                month=month,
+                total=amount,
+                count=count,
+            )
+    except IntegrityError:
+        # A concurrent writer created the row between our UPDATE and INSERT.
+        rows.update(total=F('total') + amount, count=F('count') + count)
+
+
+def move_category(user_id, source_id, target_id):
+    """Fold one category's rollup rows into another's, one write per month."""
+    summaries = MonthlySummary.objects.filter(user_id=user_id, category_id=source_id)
+    delta = RollupDelta()
+    for year, month, total, count in summaries.values_list('year', 'month', 'total', 'count'):
+        entry = delta.changes[(user_id, target_id, year, month)]
+        entry[0] += total
+        entry[1] += count
+    with transaction.atomic():
+        summaries.delete()
+        delta.apply()
+
+
+def snapshot(txn):
+    return Transaction(
+        user_id=txn.user_id,
+        category_id=txn.category_id,
+        date=txn.date,
+        amount=txn.amount,
+    )
+
+
+def record_created(txn):
+    delta = RollupDelta()
+    delta.add_transaction(txn)
+    delta.apply()
+
+
+def record_updated(before, after):
+    delta = RollupDelta()
+    delta.remove_transaction(before)
+    delta.add_transaction(after)
+    delta.apply()
+
+
+def record_deleted(txn):
+    delta = RollupDelta()
+    delta.remove_transaction(txn)
+    delta.apply()
+
+
+def compute_rollups(transactions):
+    rows = (
+        transactions
+        .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+        .values('user_id', 'category_id', 'year', 'month')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    return {
+        (r['user_id'], r['category_id'], r['year'], r['month']): (r['total'], r['count'])
+        for r in rows
+    }
+
+
+def expected_rollups(transactions, user_ids=None):
+    # Archived transactions left the table but still count towards rollups.
+    expected = compute_rollups(transactions)
+    for key, (total, count) in archived_rollups(user_ids).items():
+        hot_total, hot_count = expected.get(key, (0, 0))
+        expected[key] = (hot_total + total, hot_count + count)
+    return expected
+
+
+def stored_rollups(summaries):
+    rows = summaries.values_list('user_id', 'category_id', 'year', 'month', 'total', 'count')
+    return {(u, c, y, m): (total, count) for u, c, y, m, total, count in rows}
+
+
+def lock_rollups(summaries):
+    """
+    Hold back writers' deltas until the current transaction ends. On
+    PostgreSQL the whole table is locked, which also holds back rows a
+    writer would insert for a new month; elsewhere the rows are locked.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'LOCK TABLE {MonthlySummary._meta.db_table} IN SHARE ROW EXCLUSIVE MODE'
+            )
+    else:
+        list(summaries.select_for_update().values_list('pk', flat=True))
+
+
+def rebuild(user_ids=None):
+    transactions = Transaction.objects.all()
+    summaries = MonthlySummary.objects.all()
+    if user_ids:
+        transactions = transactions.filter(user_id__in=user_ids)
+        summaries = summaries.filter(user_id__in=user_ids)
+
+    with transaction.atomic():
+        # Transactions are read only once writers are held back, so a
+        # delta committed during the rebuild is never overwritten.
+        lock_rollups(summaries)
+        stored = stored_rollups(summaries)
+        summaries.delete()
+        expected = expected_rollups(transactions, user_ids)
+        MonthlySummary.objects.bulk_create(
+            [
+                MonthlySummary(
+                    user_id=user_id,
+                    category_id=category_id,
+                    year=year,
+                    month=month,
+                    total=total,
+                    count=count,
+                )
+                for (user_id, category_id, year, month), (total, count) in expected.items()
+            ],
+            batch_size=1000,
+        )
+        # Cached summaries of users whose rollups changed are now stale.
+        changed = {key[0] for key in expected.keys() | stored.keys() if expected.get(key) != stored.get(key)}
+        for user_id in changed:
+            bump_data_version(user_id)
+    return len(expected)
+
+
+def verify(user_ids=None):
+    transactions = Transaction.objects.all()
+    summaries = MonthlySummary.objects.exclude(count=0, total=0)
+    if user_ids:
+        transactions = transactions.filter(user_id__in=user_ids)
+        summaries = summaries.filter(user_id__in=user_ids)
+
+    expected = expected_rollups(transactions, user_ids)
+    stored = stored_rollups(summaries)
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        if expected.get(key) != stored.get(key):
+            mismatches.append((key, expected.get(key), stored.get(key)))
+    return mismatches
@@ -0,0 +1,84 @@
+import functools
+import inspect
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA = 'replica'
+
+reading_from_replica = ContextVar('reading_from_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def sticky_key(user_id):
+    return f'primary-reads:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """
+    Keep the user's reads on the primary for REPLICA_STICKY_SECONDS, long
+    enough for the replica to catch up with the write being made. Set
+    before the write commits so no read can slip in between.
+    """
+    if replica_configured():
+        cache.set(sticky_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+class ReplicaRouter:
+    """
+    Sends reads made inside a ``reads_from_replica`` handler to the replica
+    when one is configured. Everything else uses the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        if reading_from_replica.get():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is migrated by replicating the primary.
+        if db == REPLICA:
+            return False
+        return None
+
+
+def reads_from_replica(method):
+    """
+    Run a GET handler's queries on the replica, unless the user wrote
+    recently. Works on sync and async handlers; querysets evaluated after
+    the handler returns, as in streamed responses, need ``pinned()``.
+    """
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, request, *args, **kwargs):
+            if not replica_configured() or await cache.aget(sticky_key(request.user.id)):
+                return await method(self, request, *args, **kwargs)
+            token = reading_from_replica.set(True)
+            try:
+                return await method(self, request, *args, **kwargs)
+            finally:
+                reading_from_replica.reset(token)
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        if not replica_configured() or cache.get(sticky_key(request.user.id)):
+            return method(self, request, *args, **kwargs)
+        token = reading_from_replica.set(True)
+        try:
+            return method(self, request, *args, **kwargs)
+        finally:
+            reading_from_replica.reset(token)
+    return wrapper
+
+
+def pinned(queryset):
+    """Fix ``queryset`` to the database a read made now would use."""
+    return queryset.using(queryset.db)
@@ -0,0 +1,166 @@
+import functools
+import hashlib
+import os
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.views.decorators.csrf import csrf_exempt
+
+from .cache import is_not_modified
+from .docs import attach_schema_metadata
+
+# The UI pages fetch the JSON as ?format=openapi.
+SCHEMA_FILES = {
+    'json': 'schema.json',
+    'yaml': 'schema.yaml',
+}
+CONTENT_TYPES = {
+    'json': 'application/json; charset=utf-8',
+    'openapi': 'application/openapi+json; charset=utf-8',
+    'yaml': 'application/yaml; charset=utf-8',
+}
+
+
+def api_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Personal Budget Tracker API",
+        default_version='v1',
+        description="API documentation for budget tracker project",
+        contact=openapi.Contact(email="junaids.khan23@gmail.com"),
+    )
+
+
+@functools.cache
+def schema_view():
+    """
+    drf_yasg's schema view. drf_yasg is imported here, on first use, so
+    workers that never generate the schema or render a docs page do not
+    load it.
+    """
+    from drf_yasg.generators import OpenAPISchemaGenerator
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    class SchemaGenerator(OpenAPISchemaGenerator):
+        def get_endpoints(self, request):
+            endpoints = super().get_endpoints(request)
+            attach_schema_metadata()
+            return endpoints
+
+    return get_schema_view(
+        api_info(),
+        public=True,
+        permission_classes=[permissions.AllowAny],
+        authentication_classes=(JWTAuthentication,),
+        generator_class=SchemaGenerator,
+    )
+
+
+@functools.cache
+def live_views():
+    view = schema_view()
+    return {
+        'swagger': view.with_ui('swagger', cache_timeout=0),
+        'redoc': view.with_ui('redoc', cache_timeout=0),
+        'spec': view.without_ui(cache_timeout=0),
+    }
+
+
+def schema_path(file_format):
+    return os.path.join(settings.OPENAPI_SCHEMA_DIR, SCHEMA_FILES[file_format])
+
+
+def generate_schema():
+    """
+    The public schema as the live views build it, minus the host and
+    schemes taken from the request, so clients use whichever host served it.
+    """
+    generator = schema_view().generator_class(api_info())
+    return generator.get_schema(request=None, public=True)
+
+
+def write_schema_files(schema):
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+
+    codecs = {'json': OpenAPICodecJson, 'yaml': OpenAPICodecYaml}
+    os.makedirs(settings.OPENAPI_SCHEMA_DIR, exist_ok=True)
+    paths = []
+    for file_format, codec_class in codecs.items():
+        path = schema_path(file_format)
+        partial = path + '.tmp'
+        with open(partial, 'wb') as fh:
+            fh.write(codec_class(validators=[]).encode(schema))
+        os.replace(partial, path)
+        paths.append(path)
+    return paths
+
+
+@functools.lru_cache(maxsize=4)
+def load_schema_file(path, mtime_ns):
+    with open(path, 'rb') as fh:
+        body = fh.read()
+    return body, '"%s"' % hashlib.sha256(body).hexdigest()
+
+
+def read_schema_file(file_format):
+    """(body, etag) of the prebuilt file, reread only when it changes."""
+    path = schema_path(file_format)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return load_schema_file(path, mtime_ns)
+
+
+def render_ui(request, name):
+    """
+    A docs page from drf_yasg's template, without generating the schema:
+    the page fetches its spec from ?format=openapi, which is served from
+    the prebuilt file.
+    """
+    from drf_yasg import openapi
+    from drf_yasg.renderers import ReDocRenderer, SwaggerUIRenderer
+
+    renderer = SwaggerUIRenderer() if name == 'swagger' else ReDocRenderer()
+    swagger = openapi.Swagger(info=api_info(), _prefix='/', paths=openapi.Paths({}))
+    body = renderer.render(swagger, renderer.media_type, {'request': request})
+    response = HttpResponse(body, content_type='text/html; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def requested_format(request, kwargs):
+    file_format = (kwargs.get('format') or request.GET.get('format') or '').lstrip('.')
+    return file_format if file_format in CONTENT_TYPES else None
+
+
+def docs_view(name):
+    """
+    A docs route. The schema written by ``build_schema`` is served with a
+    content-hash ETag, and the UI pages that load it are rendered without
+    generating the schema. When it has not been built, requests are handed
+    to drf_yasg's ``name`` view, created on first use.
+    """
+    @csrf_exempt
+    def view(request, *args, **kwargs):
+        file_format = requested_format(request, kwargs)
+        prebuilt = None
+        if request.method in ('GET', 'HEAD') and (file_format or name != 'spec'):
+            prebuilt = read_schema_file('yaml' if file_format == 'yaml' else 'json')
+        if prebuilt is None:
+            return live_views()[name](request, *args, **kwargs)
+        if not file_format:
+            return render_ui(request, name)
+
+        body, etag = prebuilt
+        if is_not_modified(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type=CONTENT_TYPES[file_format])
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, no-cache'
+        return response
+    return view
@@ -0,0 +1,140 @@
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Lookup, Value
+
+from .models import TransactionSearchEntry
+
+SEARCH_CONFIG = 'simple'
+POSTGRES_INDEX_NAME = 'transactions_detail_search_idx'
+MAX_SEARCH_TERMS = 8
+
+# External-content FTS5 index over transactions.detail. user_id is indexed
+# as a column too, so a user's matches are found by intersecting posting
+# lists instead of filtering every user's hits.
+SQLITE_TABLE = 'transactions_search'
+SQLITE_TRIGGERS = {
+    'transactions_search_insert': """
+        CREATE TRIGGER IF NOT EXISTS transactions_search_insert AFTER INSERT ON transactions BEGIN
+            INSERT INTO transactions_search(rowid, detail, user_id)
+            VALUES (new.id, new.detail, new.user_id);
+        END
+    """,
+    'transactions_search_delete': """
+        CREATE TRIGGER IF NOT EXISTS transactions_search_delete AFTER DELETE ON transactions BEGIN
+            INSERT INTO transactions_search(transactions_search, rowid, detail, user_id)
+            VALUES ('delete', old.id, old.detail, old.user_id);
+        END
+    """,
+    'transactions_search_update': """
+        CREATE TRIGGER IF NOT EXISTS transactions_search_update
+        AFTER UPDATE OF detail, user_id ON transactions BEGIN
+            INSERT INTO transactions_search(transactions_search, rowid, detail, user_id)
+            VALUES ('delete', old.id, old.detail, old.user_id);
+            INSERT INTO transactions_search(rowid, detail, user_id)
+            VALUES (new.id, new.detail, new.user_id);
+        END
+    """,
+}
+
+
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+TransactionSearchEntry._meta.get_field('document').register_lookup(Match)
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_SEARCH_TERMS]
+
+
+def install_sqlite_search(connection):
+    """
+    Create the FTS5 table and its sync triggers if any are missing, and
+    rebuild the index when they were. SQLite migrations that remake the
+    transactions table drop its triggers, so this also runs after migrate.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND tbl_name = %s)",
+            [SQLITE_TABLE, 'transactions'],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if existing >= {SQLITE_TABLE, *SQLITE_TRIGGERS}:
+            return
+
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+            "detail, user_id, content='transactions', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        for sql in SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {SQLITE_TABLE}({SQLITE_TABLE}) VALUES ('rebuild')")
+
+
+def repair_sqlite_search(sender, using, **kwargs):
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and SQLITE_TABLE in connection.introspection.table_names():
+        install_sqlite_search(connection)
+
+
+def remove_sqlite_search(connection):
+    with connection.cursor() as cursor:
+        for name in SQLITE_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+
+
+def postgres_search_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(SearchVector('detail', config=SEARCH_CONFIG), name=POSTGRES_INDEX_NAME)
+
+
+def search_transactions(transactions, user_id, query):
+    """
+    Narrow ``transactions`` to rows whose detail contains every term of
+    ``query`` as a word prefix, annotated with ``search_rank`` (higher is
+    better).
+    """
+    terms = search_terms(query)
+    if not terms:
+        return transactions.none()
+
+    connection = connections[transactions.db]
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vector = SearchVector('detail', config=SEARCH_CONFIG)
+        tsquery = SearchQuery(
+            ' & '.join(f"{term}:*" for term in terms), config=SEARCH_CONFIG, search_type='raw'
+        )
+        return (
+            transactions
+            .annotate(search_vector=vector)
+            .filter(search_vector=tsquery)
+            .annotate(search_rank=SearchRank(vector, tsquery))
+        )
+
+    if connection.vendor == 'sqlite':
+        match = ' AND '.join(
+            [f'user_id:"{user_id}"'] + [f'detail:"{term}"*' for term in terms]
+        )
+        # bm25() is lower for better matches.
+        return (
+            transactions
+            .filter(search_entry__document__match=match)
+            .annotate(search_rank=-F('search_entry__rank'))
+        )
+
+    for term in terms:
+        transactions = transactions.filter(detail__icontains=term)
+    return transactions.annotate(search_rank=Value(0.0, output_field=FloatField()))
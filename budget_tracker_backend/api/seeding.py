@@ -0,0 +1,129 @@
+import math
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from . import rollups
+from .models import Budget, Categories, CategoryBudget, Transaction
+
+# (name, type, relative frequency, median amount, spread)
+CATEGORY_PROFILES = [
+    ('Salary', 'income', 2, 3200, 0.15),
+    ('Freelance', 'income', 1, 450, 0.8),
+    ('Interest', 'income', 1, 12, 0.6),
+    ('Groceries', 'expense', 30, 45, 0.6),
+    ('Dining', 'expense', 18, 28, 0.7),
+    ('Transport', 'expense', 15, 12, 0.8),
+    ('Utilities', 'expense', 4, 90, 0.4),
+    ('Rent', 'expense', 2, 1400, 0.1),
+    ('Shopping', 'expense', 10, 60, 1.0),
+    ('Health', 'expense', 3, 75, 0.9),
+    ('Entertainment', 'expense', 8, 35, 0.8),
+    ('Travel', 'expense', 2, 380, 0.9),
+]
+DETAILS = {
+    'Groceries': ['Supermarket', 'Farmers market', 'Corner shop'],
+    'Dining': ['Lunch', 'Dinner out', 'Coffee', 'Takeaway'],
+    'Transport': ['Bus pass', 'Fuel', 'Taxi', 'Train ticket'],
+    'Shopping': ['Clothes', 'Electronics', 'Books', 'Homeware'],
+}
+BATCH_SIZE = 5000
+
+
+class Seeder:
+    """
+    Generates reproducible users, categories, budgets and transactions.
+
+    Amounts are drawn per category from a log-normal (or uniform) around a
+    typical value, and dates either uniformly over the window or skewed
+    towards recent months.
+    """
+
+    def __init__(self, seed=0, months=24, amount_distribution='lognormal',
+                 date_distribution='uniform', end=None):
+        self.random = random.Random(seed)
+        self.months = months
+        self.amount_distribution = amount_distribution
+        self.date_distribution = date_distribution
+        self.end = end or date.today()
+        self.start = self.end - timedelta(days=int(months * 30.4))
+        self.password = None
+
+    def amount(self, median, spread):
+        if self.amount_distribution == 'uniform':
+            value = self.random.uniform(median * (1 - spread / 2), median * (1 + spread))
+        else:
+            value = self.random.lognormvariate(math.log(median), spread)
+        return Decimal(f'{min(max(value, 0.01), 99999999):.2f}')
+
+    def day(self):
+        span = (self.end - self.start).days
+        if self.date_distribution == 'recent':
+            offset = int(span * (1 - self.random.random() ** 2))
+        else:
+            offset = self.random.randint(0, span)
+        return self.start + timedelta(days=offset)
+
+    def create_user(self, username):
+        if self.password is None:
+            self.password = make_password('benchmark-pass-123')
+        user = User.objects.create(username=username, password=self.password)
+        categories = Categories.objects.bulk_create([
+            Categories(name=name, type=category_type, user=user)
+            for name, category_type, *_ in CATEGORY_PROFILES
+        ])
+        return user, categories
+
+    def create_budgets(self, user, categories):
+        budgets = []
+        limits = []
+        current = self.start.replace(day=1)
+        while current <= self.end:
+            amount = Decimal(self.random.randrange(1500, 4000, 50))
+            budgets.append(Budget(user=user, amount=amount, month=current.month, year=current.year))
+            for category, (_name, category_type, _weight, median, _spread) in zip(
+                categories, CATEGORY_PROFILES
+            ):
+                if category_type == 'expense':
+                    limits.append(CategoryBudget(
+                        user=user,
+                        category=category,
+                        amount=Decimal(median * 5),
+                        month=current.month,
+                        year=current.year,
+                    ))
+            current = (current + timedelta(days=32)).replace(day=1)
+        Budget.objects.bulk_create(budgets)
+        CategoryBudget.objects.bulk_create(limits)
+
+    def transactions(self, user, categories, count):
+        weights = [profile[2] for profile in CATEGORY_PROFILES]
+        for _ in range(count):
+            index = self.random.choices(range(len(categories)), weights)[0]
+            name, _type, _weight, median, spread = CATEGORY_PROFILES[index]
+            yield Transaction(
+                user=user,
+                category=categories[index],
+                amount=self.amount(median, spread),
+                date=self.day(),
+                detail=self.random.choice(DETAILS.get(name, [name])),
+            )
+
+    def seed_user(self, username, transaction_count):
+        with transaction.atomic():
+            user, categories = self.create_user(username)
+            self.create_budgets(user, categories)
+            batch = []
+            for txn in self.transactions(user, categories, transaction_count):
+                batch.append(txn)
+                if len(batch) >= BATCH_SIZE:
+                    Transaction.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                Transaction.objects.bulk_create(batch)
+            rollups.rebuild([user.id])
+        return user
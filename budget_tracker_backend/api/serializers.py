@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Categories, Transaction, Budget
+from .models import Categories, CategoryBudget, Transaction, Budget
 
 class CategoriesSerializer(serializers.ModelSerializer):
     class Meta:
@@ -32,3 +32,19 @@ class BudgetSerializer(serializers.ModelSerializer):
     class Meta:
         model = Budget
         fields = '__all__'
+
+class CategoryBudgetSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CategoryBudget
+        fields = ['id', 'category', 'amount', 'month', 'year']
+        extra_kwargs = {
+            'month': {'min_value': 1, 'max_value': 12},
+            'amount': {'min_value': 0},
+        }
+
+    def validate_category(self, category):
+        if category.user_id != self.context['request'].user.id:
+            raise serializers.ValidationError("Category not found.")
+        if category.type != 'expense':
+            raise serializers.ValidationError("Limits can only be set on expense categories.")
+        return category
@@ -1,3 +1,1406 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib.util import find_spec
+from io import StringIO
+from itertools import accumulate
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import archive, exports, forecast, metrics, rollups, schema, search
+from .authentication import bump_auth_version, get_auth_version, user_cache
+from .cache import bump_data_version, get_data_version
+from .fast_serializers import budget_reader, category_reader, transaction_reader
+from .models import ArchivedYear, Budget, Categories, MonthlySummary, Transaction
+from .renderers import ORJSONRenderer
+from .routers import REPLICA, sticky_key
+from .serializers import BudgetSerializer, CategoriesSerializer, TransactionSerializer
+
+
+class APITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='alice', password='secret-pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.income = Categories.objects.create(name='Salary', type='income', user=self.user)
+        self.expense = Categories.objects.create(name='Food', type='expense', user=self.user)
+
+    def add_transaction(self, category, amount, day, detail=''):
+        txn = Transaction.objects.create(
+            user=self.user,
+            category=category,
+            amount=Decimal(amount),
+            date=day,
+            detail=detail,
+        )
+        rollups.record_created(txn)
+        return txn
+
+
+class TransactionPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        start = date(2025, 1, 1)
+        # Two rows per day so the (date, id) tiebreak is exercised.
+        for i in range(25):
+            self.add_transaction(self.expense, '10.00', start + timedelta(days=i // 2))
+
+    def walk(self, url):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return seen
+
+    def test_unpaginated_list_is_unchanged(self):
+        response = self.client.get('/api/v1/transactions/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 25)
+
+    def test_pages_cover_every_row_once_in_order(self):
+        expected = list(
+            Transaction.objects.filter(user=self.user)
+            .order_by('-date', '-id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(self.walk('/api/v1/transactions/?limit=7'), expected)
+
+    def test_previous_link_returns_prior_page(self):
+        first = self.client.get('/api/v1/transactions/?limit=5').data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual(
+            [row['id'] for row in back['results']],
+            [row['id'] for row in first['results']],
+        )
+        self.assertIsNone(back['previous'])
+
+    def test_filters_apply_to_pages(self):
+        other = Categories.objects.create(name='Rent', type='expense', user=self.user)
+        self.add_transaction(other, '500.00', date(2025, 1, 3))
+        seen = self.walk(f'/api/v1/transactions/?limit=2&category={other.id}')
+        self.assertEqual(len(seen), 1)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/v1/transactions/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+
+class TransactionSummaryTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_transaction(self.income, '1000.00', date(2025, 1, 5))
+        self.add_transaction(self.income, '500.00', date(2025, 2, 5))
+        self.add_transaction(self.expense, '120.50', date(2025, 1, 10))
+        self.add_transaction(self.expense, '80.00', date(2025, 2, 10))
+
+    def test_totals(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/transactions/summary/')
+        self.assertEqual(response.data['total_income'], Decimal('1500.00'))
+        self.assertEqual(response.data['total_expense'], Decimal('200.50'))
+        self.assertEqual(response.data['balance'], Decimal('1299.50'))
+
+    def test_date_range(self):
+        response = self.client.get(
+            '/api/v1/transactions/summary/?startDate=2025-02-01&endDate=2025-02-28'
+        )
+        self.assertEqual(response.data['total_income'], Decimal('500.00'))
+        self.assertEqual(response.data['total_expense'], Decimal('80.00'))
+
+    def test_category_breakdown(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/transactions/summary/?breakdown=category')
+        by_name = {row['name']: row for row in response.data['categories']}
+        self.assertEqual(by_name['Salary']['total'], Decimal('1500.00'))
+        self.assertEqual(by_name['Food']['count'], 2)
+        self.assertEqual(response.data['balance'], Decimal('1299.50'))
+
+
+class MonthlySummaryTests(APITestCase):
+    def assertRollupsMatch(self):
+        self.assertEqual(rollups.verify([self.user.id]), [])
+
+    def test_api_writes_keep_rollups_in_sync(self):
+        created = self.client.post('/api/v1/transactions/', {
+            'category_id': self.expense.id, 'amount': '40.00', 'date': '2025-03-02',
+        })
+        self.assertEqual(created.status_code, 201)
+        self.client.post('/api/v1/transactions/', {
+            'category_id': self.income.id, 'amount': '900.00', 'date': '2025-03-01',
+        })
+        self.assertRollupsMatch()
+
+        pk = created.data['id']
+        self.client.put(f'/api/v1/transactions/{pk}/', {
+            'amount': '55.00', 'date': '2025-04-01', 'category_id': self.income.id,
+        })
+        self.assertRollupsMatch()
+
+        self.client.delete(f'/api/v1/transactions/{pk}/')
+        self.assertRollupsMatch()
+
+        self.client.delete(f'/api/v1/categories/{self.income.id}/')
+        self.assertRollupsMatch()
+        self.assertFalse(MonthlySummary.objects.filter(category_id=self.income.id).exists())
+
+    def test_summaries_read_rollups(self):
+        self.add_transaction(self.expense, '75.00', date(2025, 5, 3))
+        self.add_transaction(self.income, '300.00', date(2025, 5, 1))
+        Budget.objects.create(user=self.user, amount=Decimal('100.00'), month=5, year=2025)
+
+        summary = self.client.get('/api/v1/transactions/summary/').data
+        self.assertEqual(summary['balance'], Decimal('225.00'))
+
+        budget = self.client.get('/api/v1/budgets/summary/?month=5&year=2025').data
+        self.assertEqual(budget['actual_expense'], 75.0)
+        self.assertEqual(budget['remaining'], 25.0)
+
+    def test_verify_command_reports_drift(self):
+        Transaction.objects.create(
+            user=self.user, category=self.expense, amount=Decimal('10.00'), date=date(2025, 6, 1)
+        )
+        with self.assertRaises(CommandError):
+            call_command('rebuild_rollups', '--verify', stdout=StringIO(), stderr=StringIO())
+        call_command('rebuild_rollups', stdout=StringIO())
+        call_command('rebuild_rollups', '--verify', stdout=StringIO())
+
+    def test_rebuild_reads_transactions_once_writers_are_held_back(self):
+        calls = mock.Mock()
+        with mock.patch.object(rollups, 'lock_rollups', wraps=rollups.lock_rollups) as lock, \
+                mock.patch.object(rollups, 'expected_rollups', wraps=rollups.expected_rollups) as scan:
+            calls.attach_mock(lock, 'lock')
+            calls.attach_mock(scan, 'scan')
+            rollups.rebuild()
+        self.assertEqual([name for name, _, _ in calls.mock_calls], ['lock', 'scan'])
+
+    def test_rebuild_invalidates_cached_summaries(self):
+        Transaction.objects.create(
+            user=self.user, category=self.expense, amount=Decimal('10.00'), date=date(2025, 6, 1)
+        )
+        before = get_data_version(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_rollups', stdout=StringIO())
+        self.assertNotEqual(get_data_version(self.user.id), before)
+
+
+class AdminEditTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        admin_user = User.objects.create_superuser(username='root', password='secret-pass-123')
+        self.admin_client = Client()
+        self.admin_client.force_login(admin_user)
+
+    def admin_url(self, action, *args):
+        return reverse(f'admin:api_transaction_{action}', args=args)
+
+    def test_transaction_edits_keep_rollups_in_step(self):
+        txn = self.add_transaction(self.expense, '25.00', date(2025, 6, 3))
+        form = {
+            'user': self.user.id,
+            'category': self.expense.id,
+            'amount': '40.00',
+            'date': '2025-07-01',
+            'detail': '',
+        }
+        before = get_data_version(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.admin_client.post(self.admin_url('change', txn.id), form)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(rollups.verify(), [])
+        self.assertNotEqual(get_data_version(self.user.id), before)
+
+        before = get_data_version(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.admin_client.post(self.admin_url('delete', txn.id), {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Transaction.objects.filter(id=txn.id).exists())
+        self.assertEqual(rollups.verify(), [])
+        self.assertNotEqual(get_data_version(self.user.id), before)
+
+    def test_category_delete_is_soft(self):
+        self.add_transaction(self.expense, '25.00', date(2025, 6, 3))
+        response = self.admin_client.post(
+            reverse('admin:api_categories_delete', args=[self.expense.id]), {'post': 'yes'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNotNone(Categories.all_objects.get(id=self.expense.id).deleted_at)
+
+
+class BudgetRangeSummaryTests(APITestCase):
+    def test_months_in_range(self):
+        Budget.objects.create(user=self.user, amount=Decimal('100.00'), month=12, year=2024)
+        Budget.objects.create(user=self.user, amount=Decimal('200.00'), month=2, year=2025)
+        self.add_transaction(self.expense, '30.00', date(2024, 12, 24))
+        self.add_transaction(self.expense, '250.00', date(2025, 2, 1))
+        self.add_transaction(self.income, '999.00', date(2025, 2, 1))
+        self.add_transaction(self.expense, '5.00', date(2025, 3, 1))
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/budgets/summary/?from=2024-12&to=2025-02')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(m['year'], m['month'], m['budget'], m['actual_expense'], m['remaining'])
+             for m in response.data['months']],
+            [(2024, 12, 100.0, 30.0, 70.0), (2025, 1, 0.0, 0.0, 0.0), (2025, 2, 200.0, 250.0, -50.0)],
+        )
+
+    def test_invalid_range(self):
+        for query in ('from=2025-01', 'from=2025-05&to=2025-01', 'from=2025-13&to=2025-14',
+                      'from=2000-01&to=2025-01', 'month=13&year=2030', 'month=0', 'month=abc',
+                      'month=1&year=0', 'month=1&year=10000'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/v1/budgets/summary/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+
+class BudgetForecastTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = date.today()
+        self.history = forecast.trailing_months(self.today.year, self.today.month, 3)
+        for year, month in self.history:
+            self.add_transaction(self.expense, '100.00', date(year, month, 1))
+            self.add_transaction(
+                self.expense, '200.00', date(year, month, forecast.month_days(year, month))
+            )
+            self.add_transaction(self.income, '999.00', date(year, month, 2))
+        self.add_transaction(self.expense, '50.00', self.today.replace(day=1))
+
+    def test_projection_from_day_of_month_curves(self):
+        curve = [0.0] * 30
+        curve[0], curve[29] = 100.0, 200.0
+        model = forecast.Forecast([list(accumulate(curve)), list(accumulate(curve))])
+        self.assertAlmostEqual(model.project(2025, 6, Decimal('50'), date(2025, 6, 15)), 250.0)
+        self.assertEqual(model.project(2025, 5, Decimal('50'), date(2025, 6, 15)), 50.0)
+        self.assertEqual(model.project(2025, 7, Decimal('0'), date(2025, 6, 15)), 300.0)
+        run_rate = forecast.Forecast([])
+        self.assertEqual(run_rate.project(2025, 6, Decimal('50'), date(2025, 6, 15)), 100.0)
+
+    def test_forecast_endpoint(self):
+        Budget.objects.create(
+            user=self.user, amount=Decimal('200.00'), month=self.today.month, year=self.today.year
+        )
+        response = self.client.get('/api/v1/budgets/forecast/')
+        self.assertEqual(response.status_code, 200)
+        last_day = self.today.day == forecast.month_days(self.today.year, self.today.month)
+        share = 1.0 if last_day else 1 / 3
+        self.assertEqual(response.data['trailing_months'], 3)
+        self.assertEqual(response.data['trailing_average'], 300.0)
+        self.assertAlmostEqual(response.data['projected_expense'], 50 + (1 - share) * 300, places=2)
+        self.assertEqual(response.data['over_budget'], not last_day)
+        self.assertEqual(self.client.get('/api/v1/budgets/forecast/?month=13').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/budgets/forecast/?year=10000').status_code, 400)
+
+    def test_budget_summary_includes_projection(self):
+        current = self.client.get('/api/v1/budgets/summary/').data
+        self.assertGreaterEqual(current['projected_expense'], current['actual_expense'])
+        self.assertFalse(current['over_budget'])
+
+        year, month = self.history[0]
+        past = self.client.get(f'/api/v1/budgets/summary/?month={month}&year={year}').data
+        self.assertEqual(past['projected_expense'], past['actual_expense'])
+
+    def test_writes_refresh_only_the_month_they_touch(self):
+        self.client.get('/api/v1/budgets/forecast/')
+        keys = forecast.curve_keys(self.user.id, self.history)
+        self.assertEqual(len(cache.get_many(list(keys.values()))), 3)
+
+        year, month = self.history[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/v1/transactions/', {
+                'amount': '300.00',
+                'date': date(year, month, 10).isoformat(),
+                'category_id': self.expense.id,
+                'detail': '',
+            }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        fresh = forecast.curve_keys(self.user.id, self.history)
+        self.assertNotEqual(fresh[(year, month)], keys[(year, month)])
+        self.assertEqual(len(cache.get_many(list(fresh.values()))), 2)
+
+        # A reader that computed the curve before the commit writes it back late.
+        cache.set(keys[(year, month)], cache.get(keys[self.history[1]]))
+        self.assertEqual(self.client.get('/api/v1/budgets/forecast/').data['trailing_average'], 400.0)
+
+
+class TimeSeriesTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_transaction(self.expense, '10.00', date(2025, 1, 6))
+        self.add_transaction(self.expense, '15.00', date(2025, 1, 8))
+        self.add_transaction(self.income, '100.00', date(2025, 1, 21))
+
+    def test_weekly_by_type_fills_gaps(self):
+        # One grouped query, plus the lookup of archived years in range.
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                '/api/v1/transactions/timeseries/?interval=week&startDate=2025-01-01&endDate=2025-01-31'
+            )
+        data = response.data
+        self.assertEqual(
+            data['buckets'],
+            ['2024-12-30', '2025-01-06', '2025-01-13', '2025-01-20', '2025-01-27'],
+        )
+        series = {s['type']: s['values'] for s in data['series']}
+        self.assertEqual(series['expense'], [0.0, 25.0, 0.0, 0.0, 0.0])
+        self.assertEqual(series['income'], [0.0, 0.0, 0.0, 100.0, 0.0])
+
+    def test_monthly_by_category_uses_data_extent(self):
+        data = self.client.get('/api/v1/transactions/timeseries/?groupBy=category').data
+        self.assertEqual(data['buckets'], ['2025-01-01'])
+        self.assertEqual(
+            [(s['name'], s['values']) for s in data['series']],
+            [('Food', [25.0]), ('Salary', [100.0])],
+        )
+
+    def test_rejects_bad_parameters(self):
+        for query in ('interval=hour', 'groupBy=user',
+                      'interval=day&startDate=1900-01-01&endDate=2025-01-01'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/v1/transactions/timeseries/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+
+class UserDataCacheTests(APITestCase):
+    def test_repeated_reads_skip_the_database(self):
+        self.add_transaction(self.expense, '20.00', date(2025, 1, 2))
+        for url in ('/api/v1/transactions/summary/', '/api/v1/budgets/summary/?month=1&year=2025',
+                    '/api/v1/categories/'):
+            first = self.client.get(url).data
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url).data, first)
+
+    def test_writes_invalidate_cached_reads(self):
+        self.assertEqual(self.client.get('/api/v1/transactions/summary/').data['total_expense'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/v1/transactions/', {
+                'category_id': self.expense.id, 'amount': '40.00', 'date': '2025-03-02',
+            })
+        self.assertEqual(
+            self.client.get('/api/v1/transactions/summary/').data['total_expense'], Decimal('40.00')
+        )
+
+        self.assertEqual(len(self.client.get('/api/v1/categories/').data), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/v1/categories/', {'name': 'Rent', 'type': 'expense'})
+        self.assertEqual(len(self.client.get('/api/v1/categories/').data), 3)
+
+    def test_cache_is_per_user(self):
+        self.client.get('/api/v1/categories/')
+        other = User.objects.create_user(username='bob', password='secret-pass-123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get('/api/v1/categories/').data, [])
+
+
+class ConditionalGetTests(APITestCase):
+    urls = [
+        '/api/v1/categories/',
+        '/api/v1/budgets/',
+        '/api/v1/transactions/',
+        '/api/v1/transactions/summary/',
+        '/api/v1/budgets/summary/?month=1&year=2025',
+        '/api/v1/budgets/summary/',
+        '/api/v1/budgets/forecast/',
+        '/api/v1/category-budgets/?month=1&year=2025',
+        '/api/v1/category-budgets/summary/?month=1&year=2025',
+    ]
+
+    def test_matching_etag_returns_304_without_queries(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+    def test_etag_changes_after_write_and_with_query(self):
+        etag = self.client.get('/api/v1/transactions/')['ETag']
+        self.assertNotEqual(self.client.get('/api/v1/transactions/?limit=5')['ETag'], etag)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/v1/transactions/', {
+                'category_id': self.expense.id, 'amount': '40.00', 'date': '2025-03-02',
+            })
+        response = self.client.get('/api/v1/transactions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.registry.histograms.clear()
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/v1/categories/')
+        timing = response['Server-Timing']
+        self.assertIn('total;dur=', timing)
+        self.assertIn('db;dur=', timing)
+        self.assertIn('render;dur=', timing)
+
+    @override_settings(METRICS_TOKEN='scrape-token')
+    def test_metrics_endpoint(self):
+        self.client.get('/api/v1/categories/')
+        self.client.get('/api/v1/categories/')
+        self.assertEqual(self.client.get('/metrics/').status_code, 401)
+
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('# TYPE budget_request_duration_seconds histogram', body)
+        self.assertIn(
+            'budget_request_duration_seconds_count{view="categories",method="GET"} 2', body
+        )
+
+    def test_metrics_disabled_without_token(self):
+        self.assertEqual(self.client.get('/metrics/').status_code, 404)
+
+    def test_worker_files_are_merged(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_MULTIPROC_DIR=directory):
+            other_worker = metrics.Registry()
+            other_worker.observe(('categories', 'GET'), {'budget_request_db_queries': 3})
+            os.replace(
+                os.path.join(directory, f'metrics-{os.getpid()}.json'),
+                os.path.join(directory, 'metrics-99999.json'),
+            )
+            metrics.registry.observe(('categories', 'GET'), {'budget_request_db_queries': 1})
+
+            histograms = metrics.collect()
+        merged = histograms[('budget_request_db_queries', 'categories', 'GET')]
+        self.assertEqual(sum(merged.counts), 2)
+        self.assertEqual(merged.sum, 4)
+
+
+class WorkerQueryMetricsTests(TransactionTestCase):
+    """Outside a test transaction gather_queries runs on worker threads."""
+
+    def test_worker_thread_queries_are_timed(self):
+        cache.clear()
+        metrics.registry.histograms.clear()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='alice', password='secret-pass-123'))
+
+        response = client.get('/api/v1/budgets/summary/?month=1&year=2020')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        queries = metrics.collect()[('budget_request_db_queries', 'budget-summary', 'GET')]
+        self.assertEqual(queries.sum, 2)
+
+class AsyncViewTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_transaction(self.expense, '40.00', date(2025, 1, 10))
+        self.add_transaction(self.income, '900.00', date(2025, 2, 1))
+        Budget.objects.create(user=self.user, month=1, year=2025, amount=Decimal('100.00'))
+        token = RefreshToken.for_user(self.user).access_token
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    async def test_asgi_responses_match_wsgi(self):
+        for path in (
+            '/api/v1/categories/',
+            '/api/v1/transactions/',
+            '/api/v1/transactions/?limit=1',
+            '/api/v1/transactions/summary/?breakdown=category',
+            '/api/v1/budgets/',
+            '/api/v1/budgets/summary/?month=1&year=2025',
+            '/api/v1/budgets/summary/?from=2024-12&to=2025-02',
+        ):
+            await sync_to_async(cache.clear)()
+            wsgi = await sync_to_async(self.client.get)(path)
+            await sync_to_async(cache.clear)()
+            asgi = await self.async_client.get(path, headers=self.headers)
+            self.assertEqual(asgi.status_code, 200, path)
+            self.assertEqual(json.loads(asgi.content), json.loads(wsgi.content), path)
+            self.assertIn('queries"', asgi['Server-Timing'])
+            self.assertNotIn('db;dur=0.0;desc="0 queries"', asgi['Server-Timing'])
+
+    async def test_conditional_get_and_auth(self):
+        response = await self.async_client.get('/api/v1/budgets/summary/', headers=self.headers)
+        repeat = await self.async_client.get(
+            '/api/v1/budgets/summary/',
+            headers={**self.headers, 'If-None-Match': response['ETag']},
+        )
+        self.assertEqual(repeat.status_code, 304)
+        anonymous = await self.async_client.get('/api/v1/budgets/summary/')
+        self.assertEqual(anonymous.status_code, 401)
+
+    async def test_writes_still_run_synchronously(self):
+        response = await self.async_client.post(
+            '/api/v1/categories/',
+            {'name': 'Rent', 'type': 'expense'},
+            content_type='application/json',
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(await Categories.objects.filter(name='Rent').aexists())
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        user_cache.clear()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_identity_costs_no_query_once_cached(self):
+        self.client.get('/api/v1/budgets/')
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version(self.user.id)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/budgets/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api/v1/budgets/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/v1/budgets/').status_code, 401)
+
+    def cached_user(self):
+        return user_cache.get(self.user.id, get_auth_version(self.user.id))
+
+    def test_password_change_evicts_cached_user(self):
+        self.client.get('/api/v1/budgets/')
+        self.assertIsNotNone(self.cached_user())
+        self.user.set_password('another-pass-456')
+        self.user.save()
+        self.assertIsNone(self.cached_user())
+
+    def test_changes_made_by_another_process_are_picked_up(self):
+        self.assertEqual(self.client.get('/api/v1/budgets/').status_code, 200)
+        # Another worker deactivates the user: the row changes and its
+        # post_save handler bumps the shared version, but this process's
+        # entry is left in place.
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_auth_version(self.user.id)
+        self.assertEqual(self.client.get('/api/v1/budgets/').status_code, 401)
+
+    @override_settings(AUTH_USER_CACHE_TTL=0)
+    def test_entries_expire(self):
+        self.client.get('/api/v1/budgets/')
+        self.assertIsNone(self.cached_user())
+
+    def test_cached_user_is_not_shared_between_requests(self):
+        self.client.get('/api/v1/budgets/')
+        self.cached_user().first_name = 'Mallory'
+        self.assertEqual(self.cached_user().first_name, '')
+
+
+class TransactionSearchTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.lunch = self.add_transaction(self.expense, '12.00', date(2025, 3, 1), 'Lunch at the café')
+        self.groceries = self.add_transaction(
+            self.expense, '80.00', date(2025, 3, 2), 'Weekly groceries'
+        )
+        self.both = self.add_transaction(
+            self.expense, '30.00', date(2025, 3, 3), 'Groceries and lunch, lunch again'
+        )
+        self.add_transaction(self.income, '900.00', date(2025, 3, 4), 'Salary March')
+
+    def search(self, query, extra=''):
+        response = self.client.get(f'/api/v1/transactions/?search={query}{extra}')
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data]
+
+    def test_terms_match_word_prefixes_ranked(self):
+        self.assertEqual(self.search('lunch'), [self.both.id, self.lunch.id])
+        self.assertEqual(self.search('groc LUN'), [self.both.id])
+        self.assertEqual(self.search('cafe'), [self.lunch.id])
+        self.assertEqual(self.search('unch'), [])
+
+    def test_combines_with_filters_and_limit(self):
+        self.assertEqual(self.search('lunch', '&endDate=2025-03-02&startDate=2025-01-01'), [self.lunch.id])
+        self.assertEqual(self.search('lunch', '&limit=1'), [self.both.id])
+
+    def test_index_follows_writes(self):
+        self.lunch.detail = 'Dinner'
+        self.lunch.save()
+        self.groceries.delete()
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, category=self.expense, amount=1, date=date(2025, 3, 5),
+                        detail='Late lunch'),
+        ])
+        self.assertEqual(len(self.search('lunch')), 2)
+        self.assertEqual(self.search('dinner'), [self.lunch.id])
+        self.assertEqual(self.search('weekly'), [])
+
+    def test_missing_triggers_are_restored_after_migrate(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER transactions_search_insert')
+        self.add_transaction(self.expense, '5.00', date(2025, 3, 6), 'Lunch while unindexed')
+        search.repair_sqlite_search(sender=None, using='default')
+        self.add_transaction(self.expense, '5.00', date(2025, 3, 7), 'Lunch afterwards')
+        self.assertEqual(len(self.search('lunch')), 4)
+
+    def test_other_users_rows_are_not_matched(self):
+        other = User.objects.create_user(username='bob', password='secret-pass-123')
+        category = Categories.objects.create(name='Food', type='expense', user=other)
+        Transaction.objects.create(user=other, category=category, amount=5, date=date(2025, 3, 1),
+                                   detail='Lunch')
+        self.assertEqual(len(self.search('lunch')), 2)
+
+
+class CategoryBudgetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.rent = Categories.objects.create(name='Rent', type='expense', user=self.user)
+        self.travel = Categories.objects.create(name='Travel', type='expense', user=self.user)
+        self.add_transaction(self.expense, '30.00', date(2025, 3, 3))
+        self.add_transaction(self.expense, '45.50', date(2025, 3, 20))
+        self.add_transaction(self.rent, '900.00', date(2025, 3, 1))
+        self.add_transaction(self.expense, '99.00', date(2025, 4, 1))
+        self.add_transaction(self.income, '2000.00', date(2025, 3, 1))
+
+    def set_limit(self, category, amount, month=3, year=2025):
+        return self.client.post('/api/v1/category-budgets/', {
+            'category': category.id, 'amount': amount, 'month': month, 'year': year,
+        }, format='json')
+
+    def test_summary_joins_limits_and_spending(self):
+        self.assertEqual(self.set_limit(self.expense, '100.00').status_code, 201)
+        self.assertEqual(self.set_limit(self.rent, '800.00').status_code, 201)
+        self.set_limit(self.expense, '10.00', month=4)
+
+        response = self.client.get('/api/v1/category-budgets/summary/?month=3&year=2025')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['categories'], [
+            {'id': self.expense.id, 'name': 'Food', 'limit': 100.0, 'spent': 75.5, 'remaining': 24.5},
+            {'id': self.rent.id, 'name': 'Rent', 'limit': 800.0, 'spent': 900.0, 'remaining': -100.0},
+            {'id': self.travel.id, 'name': 'Travel', 'limit': None, 'spent': 0.0, 'remaining': None},
+        ])
+
+    def test_summary_is_one_query_for_any_number_of_categories(self):
+        for i in range(20):
+            category = Categories.objects.create(name=f'Extra {i}', type='expense', user=self.user)
+            self.set_limit(category, '10.00')
+            self.add_transaction(category, '1.00', date(2025, 3, 5))
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/category-budgets/summary/?month=3&year=2025')
+        self.assertEqual(len(response.data['categories']), 23)
+
+    def test_limits_are_validated(self):
+        self.set_limit(self.expense, '100.00')
+        self.assertEqual(self.set_limit(self.expense, '50.00').status_code, 400)
+        self.assertIn('category', self.set_limit(self.income, '50.00').data)
+        other = User.objects.create_user(username='bob', password='secret-pass-123')
+        foreign = Categories.objects.create(name='Theirs', type='expense', user=other)
+        self.assertIn('category', self.set_limit(foreign, '50.00').data)
+        self.assertIn('month', self.set_limit(self.rent, '50.00', month=13).data)
+
+    def test_update_delete_and_list(self):
+        limit_id = self.set_limit(self.expense, '100.00').data['id']
+        response = self.client.put(f'/api/v1/category-budgets/{limit_id}/', {'amount': '120.00'}, format='json')
+        self.assertEqual(response.data['amount'], '120.00')
+        listed = self.client.get('/api/v1/category-budgets/?month=3&year=2025').data
+        self.assertEqual(listed, [
+            {'id': limit_id, 'category': self.expense.id, 'amount': '120.00', 'month': 3, 'year': 2025},
+        ])
+        self.assertEqual(self.client.delete(f'/api/v1/category-budgets/{limit_id}/').status_code, 204)
+        self.assertEqual(self.client.get('/api/v1/category-budgets/?month=3&year=2025').data, [])
+        self.assertEqual(self.client.get('/api/v1/category-budgets/?month=x').status_code, 400)
+
+    def test_default_month_follows_the_date(self):
+        self.set_limit(self.expense, '100.00')
+        self.set_limit(self.expense, '10.00', month=4)
+
+        def on(day):
+            class FrozenDate(date):
+                @classmethod
+                def today(cls):
+                    return day
+            return mock.patch('api.views.date', FrozenDate)
+
+        for url in ('/api/v1/category-budgets/summary/', '/api/v1/category-budgets/'):
+            with on(date(2025, 3, 31)):
+                march = self.client.get(url)
+            with on(date(2025, 4, 1)):
+                april = self.client.get(url, HTTP_IF_NONE_MATCH=march['ETag'])
+            self.assertEqual(april.status_code, 200)
+            self.assertNotEqual(april['ETag'], march['ETag'])
+            self.assertNotEqual(april.data, march.data)
+        self.assertEqual((march.data[0]['month'], april.data[0]['month']), (3, 4))
+
+
+class BudgetConstraintTests(APITestCase):
+    def test_second_budget_for_month_is_rejected(self):
+        payload = {'amount': '300.00', 'month': 4, 'year': 2025}
+        self.assertEqual(self.client.post('/api/v1/budgets/', payload).status_code, 201)
+        self.assertEqual(self.client.post('/api/v1/budgets/', payload).status_code, 400)
+
+
+class PrebuiltSchemaTests(TestCase):
+    def setUp(self):
+        schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(schema_dir.cleanup)
+        overridden = override_settings(OPENAPI_SCHEMA_DIR=schema_dir.name)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+
+    def test_live_schema_when_not_built(self):
+        response = self.client.get('/swagger.json/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        parameters = json.loads(response.content)['paths']['/transactions/']['get']['parameters']
+        self.assertIn('category', [parameter['name'] for parameter in parameters])
+
+    def test_prebuilt_schema_is_served_with_etag(self):
+        live = json.loads(self.client.get('/swagger.json/').content)
+        call_command('build_schema', stdout=StringIO())
+
+        response = self.client.get('/swagger.json/')
+        with open(schema.schema_path('json'), 'rb') as fh:
+            self.assertEqual(response.content, fh.read())
+        self.assertEqual(json.loads(response.content)['paths'], live['paths'])
+        self.assertEqual(response['Content-Type'], 'application/json; charset=utf-8')
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/swagger.json/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/swagger/?format=openapi')['ETag'], etag)
+        self.assertNotEqual(self.client.get('/swagger.yaml/')['ETag'], etag)
+        self.assertEqual(self.client.get('/swagger/').status_code, 200)
+
+    def test_ui_pages_do_not_generate_the_schema(self):
+        from drf_yasg.generators import OpenAPISchemaGenerator
+
+        call_command('build_schema', stdout=StringIO())
+        with mock.patch.object(OpenAPISchemaGenerator, 'get_schema') as get_schema:
+            for url in ('/swagger/', '/redoc/'):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+                self.assertContains(response, 'Personal Budget Tracker API')
+                self.assertEqual(self.client.get(url + '?format=openapi').status_code, 200)
+        get_schema.assert_not_called()
+
+    def test_worker_startup_does_not_load_drf_yasg(self):
+        with tempfile.NamedTemporaryFile(suffix='.json') as fh:
+            call_command('benchmark_startup', '--repeat', '1', '--output', fh.name, stdout=StringIO())
+            self.assertFalse(json.load(fh)['results']['docs_loaded'])
+
+
+class SeedDataTests(TestCase):
+    def test_seed_is_reproducible(self):
+        totals = []
+        for prefix in ('first', 'second'):
+            call_command(
+                'seed_data', '--users', '1', '--transactions', '300', '--seed', '7',
+                '--prefix', prefix, stdout=StringIO(),
+            )
+            user = User.objects.get(username=f'{prefix}_0')
+            self.assertEqual(Transaction.objects.filter(user=user).count(), 300)
+            totals.append(sorted(
+                Transaction.objects.filter(user=user).values_list('amount', 'date', 'category__name')
+            ))
+        self.assertEqual(totals[0], totals[1])
+        self.assertEqual(rollups.verify(), [])
+
+
+class FastReadPathTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_transaction(self.expense, '0.10', date(2025, 1, 2), detail='Café ☕ "quoted"')
+        self.add_transaction(self.income, '12345678.90', date(2025, 1, 2))
+        self.add_transaction(self.expense, '7', date(2024, 12, 31), detail='')
+        Budget.objects.create(user=self.user, amount=Decimal('1500'), month=1, year=2025)
+        Budget.objects.create(user=self.user, amount=Decimal('0.05'), month=2, year=2025)
+
+    def assertParity(self, serializer_class, reader, queryset):
+        renderer = JSONRenderer()
+        expected = renderer.render(serializer_class(queryset, many=True).data)
+        self.assertEqual(renderer.render(reader.read(queryset)), expected)
+
+    def test_output_is_byte_identical(self):
+        transactions = Transaction.objects.filter(user=self.user).order_by('-date', '-id')
+        self.assertParity(TransactionSerializer, transaction_reader, transactions)
+        self.assertParity(
+            CategoriesSerializer, category_reader, Categories.objects.filter(user=self.user)
+        )
+        self.assertParity(BudgetSerializer, budget_reader, Budget.objects.filter(user=self.user))
+
+    def test_list_views_match_serializers(self):
+        transactions = Transaction.objects.filter(user=self.user).order_by('-date', '-id')
+        response = self.client.get('/api/v1/transactions/')
+        self.assertEqual(
+            response.content, JSONRenderer().render(TransactionSerializer(transactions, many=True).data)
+        )
+
+
+class QueryPlanTests(APITestCase):
+    """
+    Runs every query an endpoint issues through the database's planner and
+    fails if any of our tables is read with a full scan.
+    """
+    tables = (
+        'transactions', 'category', 'budget', 'monthly_summary', 'category_budget', 'archived_year',
+    )
+    endpoints = [
+        '/api/v1/categories/',
+        '/api/v1/budgets/',
+        '/api/v1/transactions/',
+        '/api/v1/transactions/?startDate=2025-01-01&endDate=2025-01-31',
+        '/api/v1/transactions/?category={expense}&startDate=2025-01-01&endDate=2025-03-31',
+        '/api/v1/transactions/?limit=5',
+        '/api/v1/transactions/?search=lunch&category={expense}',
+        '/api/v1/transactions/summary/',
+        '/api/v1/transactions/summary/?startDate=2025-01-01&endDate=2025-01-31',
+        '/api/v1/transactions/summary/?breakdown=category',
+        '/api/v1/budgets/summary/?month=1&year=2025',
+        '/api/v1/budgets/summary/',
+        '/api/v1/budgets/forecast/',
+        '/api/v1/category-budgets/?month=1&year=2025',
+        '/api/v1/category-budgets/summary/?month=1&year=2025',
+    ]
+
+    def setUp(self):
+        super().setUp()
+        other = User.objects.create_user(username='bob', password='secret-pass-123')
+        other_category = Categories.objects.create(name='Misc', type='expense', user=other)
+        for i in range(60):
+            day = date(2025, 1, 1) + timedelta(days=i)
+            self.add_transaction(self.expense if i % 3 else self.income, '12.00', day)
+            Transaction.objects.create(user=other, category=other_category, amount=1, date=day)
+        Budget.objects.create(user=self.user, amount=Decimal('500.00'), month=1, year=2025)
+        Budget.objects.create(user=other, amount=Decimal('500.00'), month=1, year=2025)
+        rollups.rebuild()
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('EXPLAIN ' + sql)
+                return [row[0] for row in cursor.fetchall()]
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def full_scans(self, plan):
+        scans = []
+        for line in plan:
+            for table in self.tables:
+                if connection.vendor == 'postgresql':
+                    if f'Seq Scan on {table} ' in line + ' ':
+                        scans.append(line)
+                elif line.startswith(f'SCAN {table}') and 'INDEX' not in line:
+                    scans.append(line)
+        return scans
+
+    def test_endpoints_avoid_full_table_scans(self):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest('query plan check supports SQLite and PostgreSQL')
+        for url in self.endpoints:
+            url = url.format(expense=self.expense.id)
+            with self.subTest(url=url), CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                for query in ctx.captured_queries:
+                    scans = self.full_scans(self.explain(query['sql']))
+                    self.assertEqual(scans, [], query['sql'])
+
+    def test_transaction_list_is_read_in_index_order(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('sort detection relies on SQLite plan output')
+        for url in ('/api/v1/transactions/', '/api/v1/transactions/?limit=5'):
+            with self.subTest(url=url), CaptureQueriesContext(connection) as ctx:
+                self.client.get(url)
+                plan = self.explain(ctx.captured_queries[-1]['sql'])
+                self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+
+class TransactionExportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_transaction(self.expense, '12.50', date(2025, 1, 2), detail='Lunch, with "team"')
+        self.add_transaction(self.income, '900.00', date(2025, 1, 1))
+
+    def read(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        rows = list(csv.reader(StringIO(self.read('/api/v1/transactions/export/'))))
+        self.assertEqual(rows[0][:4], ['id', 'date', 'detail', 'amount'])
+        self.assertEqual(rows[1][1:4], ['2025-01-02', 'Lunch, with "team"', '12.50'])
+        self.assertEqual(len(rows), 3)
+
+    def test_ndjson_with_filters(self):
+        body = self.read(
+            f'/api/v1/transactions/export/?fileFormat=ndjson&category={self.income.id}'
+        )
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['amount'], '900.00')
+        self.assertEqual(records[0]['type'], 'income')
+
+    def test_unknown_format(self):
+        response = self.client.get('/api/v1/transactions/export/?fileFormat=xml')
+        self.assertEqual(response.status_code, 400)
+
+    async def test_asgi_export_streams_in_batches(self):
+        token = RefreshToken.for_user(self.user).access_token
+        wsgi = await sync_to_async(self.read)('/api/v1/transactions/export/')
+        with mock.patch.object(exports, 'EXPORT_CHUNK_SIZE', 1):
+            response = await self.async_client.get(
+                '/api/v1/transactions/export/', headers={'Authorization': f'Bearer {token}'}
+            )
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(b''.join(chunks).decode(), wsgi)
+
+
+class ResponseEncodingTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        for day in range(1, 29):
+            self.add_transaction(self.expense, f'{day}.25', date(2025, 2, day), detail=f'Groceries {day}')
+
+    def test_orjson_matches_json_renderer(self):
+        data = [
+            transaction_reader.read(Transaction.objects.filter(user=self.user)),
+            {'total': Decimal('1.10'), 'day': date(2025, 1, 2), 'text': 'a\u2028b ☕', 7: None},
+        ]
+        for value in data:
+            self.assertEqual(ORJSONRenderer().render(value), JSONRenderer().render(value))
+
+    def test_large_response_is_gzipped_with_weak_etag(self):
+        plain = self.client.get('/api/v1/transactions/')
+        response = self.client.get('/api/v1/transactions/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+
+        response = self.client.get(
+            '/api/v1/transactions/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_small_response_is_not_compressed(self):
+        response = self.client.get('/api/v1/categories/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streamed_export_is_gzipped(self):
+        response = self.client.get('/api/v1/transactions/export/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertEqual(len(body.splitlines()), 29)
+
+    @skipUnless(find_spec('brotli'), 'brotli is not installed')
+    def test_brotli_is_preferred(self):
+        import brotli
+
+        plain = self.client.get('/api/v1/transactions/')
+        response = self.client.get('/api/v1/transactions/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), plain.content)
+
+    @skipUnless(find_spec('msgpack'), 'msgpack is not installed')
+    def test_msgpack_response(self):
+        import msgpack
+
+        response = self.client.get('/api/v1/transactions/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        plain = self.client.get('/api/v1/transactions/')
+        self.assertEqual(msgpack.unpackb(response.content), json.loads(plain.content))
+
+
+class TransactionArchiveTests(APITestCase):
+    urls = [
+        '/api/v1/transactions/',
+        '/api/v1/transactions/?startDate=2024-02-10&endDate=2025-01-20',
+        '/api/v1/transactions/?category={expense}&minAmount=20',
+        '/api/v1/transactions/summary/',
+        '/api/v1/transactions/summary/?startDate=2024-02-10&endDate=2024-12-31',
+        '/api/v1/transactions/summary/?startDate=2023-01-01&endDate=2025-12-31&breakdown=category',
+        '/api/v1/transactions/timeseries/?interval=month',
+        '/api/v1/budgets/summary/?from=2023-01&to=2025-02',
+    ]
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(TRANSACTION_ARCHIVE_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        archive.archive_cache.clear()
+
+        for i in range(24):
+            day = date(2023, 1, 15) + timedelta(days=31 * i)
+            category = self.income if i % 4 == 0 else self.expense
+            self.add_transaction(category, f'{10 + i}.25', day, detail=f'entry {i} caf\u00e9')
+
+    def responses(self):
+        cache.clear()
+        results = {}
+        for url in self.urls:
+            response = self.client.get(url.format(expense=self.expense.id))
+            self.assertEqual(response.status_code, 200, url)
+            results[url] = response.data
+        export = self.client.get('/api/v1/transactions/export/')
+        results['export'] = b''.join(export.streaming_content)
+        return results
+
+    def pages(self):
+        ids = []
+        url = '/api/v1/transactions/?limit=5'
+        while url:
+            data = self.client.get(url).data
+            ids.extend(row['id'] for row in data['results'])
+            url = data['next']
+        return ids
+
+    def archive(self, before):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('archive_transactions', before=before, stdout=StringIO())
+
+    def test_archived_rows_are_served_transparently(self):
+        before, pages = self.responses(), self.pages()
+        self.archive('2024-06-01')
+
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 7)
+        self.assertEqual(
+            list(ArchivedYear.objects.filter(user=self.user).values_list('year', 'rows')),
+            [(2023, 12), (2024, 5)],
+        )
+        self.assertEqual(self.responses(), before)
+        self.assertEqual(self.pages(), pages)
+
+    def test_rearchiving_a_year_merges_into_a_new_file(self):
+        before = self.responses()
+        self.archive('2024-03-01')
+        first = ArchivedYear.objects.get(user=self.user, year=2024)
+        first_path = archive.entry_path(first)
+        self.archive('2024-09-01')
+
+        entry = ArchivedYear.objects.get(user=self.user, year=2024)
+        self.assertEqual((entry.version, entry.rows), (2, 8))
+        self.assertFalse(os.path.exists(first_path))
+        self.assertTrue(os.path.exists(archive.entry_path(entry)))
+        self.assertEqual(self.responses(), before)
+
+    def test_rollups_include_archived_months(self):
+        stored = rollups.stored_rollups(MonthlySummary.objects.all())
+        self.archive('2024-06-01')
+        self.assertEqual(rollups.verify(), [])
+        rollups.rebuild()
+        self.assertEqual(rollups.stored_rollups(MonthlySummary.objects.all()), stored)
+
+    def test_deleting_a_category_hides_its_archived_rows(self):
+        self.archive('2025-01-01')
+        self.income.delete()
+        data = self.client.get('/api/v1/transactions/').data
+        self.assertTrue(data)
+        self.assertEqual({row['category']['type'] for row in data}, {'expense'})
+        self.assertEqual(rollups.verify(), [])
+
+
+class CategoryDeletionTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.dining = Categories.objects.create(name='Dining', type='expense', user=self.user)
+        for day in range(1, 8):
+            self.add_transaction(self.dining, '10.00', date(2025, 1, day))
+        self.add_transaction(self.expense, '5.00', date(2025, 1, 3))
+        self.add_transaction(self.income, '100.00', date(2025, 1, 4))
+
+    def summary(self):
+        response = self.client.get(
+            '/api/v1/transactions/summary/?startDate=2025-01-01&endDate=2025-01-31&breakdown=category'
+        )
+        return {row['name']: (row['total'], row['count']) for row in response.data['categories']}
+
+    def test_row_locks_leave_the_category_unlocked(self):
+        txn = Transaction.objects.filter(category=self.dining).first()
+        # SQLite has no FOR UPDATE; pretend it does and record what would be locked.
+        with mock.patch.multiple(
+            connection.features, has_select_for_update=True, has_select_for_update_of=True
+        ), mock.patch.object(connection.ops, 'for_update_sql', return_value='') as for_update:
+            self.client.put(f'/api/v1/transactions/{txn.id}/', {'amount': '11.00'})
+            self.client.post('/api/v1/transactions/batch/', {
+                'operations': [{'op': 'update', 'id': txn.id, 'data': {'amount': '12.00'}}],
+            }, format='json')
+        self.assertGreaterEqual(for_update.call_count, 2)
+        for call in for_update.call_args_list:
+            self.assertEqual(call.kwargs['of'], ['"transactions"'])
+
+    def test_delete_hides_at_once_and_purge_removes_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/v1/categories/{self.dining.id}/')
+        self.assertEqual(response.status_code, 204)
+
+        names = {row['name'] for row in self.client.get('/api/v1/categories/').data}
+        self.assertEqual(names, {'Salary', 'Food'})
+        self.assertEqual(len(self.client.get('/api/v1/transactions/').data), 2)
+        self.assertNotIn('Dining', self.summary())
+        self.assertEqual(self.client.get('/api/v1/transactions/summary/').data['total_expense'],
+                         Decimal('5.00'))
+        self.assertEqual(rollups.verify(), [])
+        created = self.client.post('/api/v1/transactions/', {
+            'category_id': self.dining.id, 'amount': '1.00', 'date': '2025-01-09',
+        })
+        self.assertEqual(created.status_code, 400)
+        self.assertEqual(Transaction.all_objects.filter(category=self.dining).count(), 7)
+
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('purge_categories', batch_size=3, stdout=StringIO())
+        deletes = [q['sql'] for q in ctx.captured_queries
+                   if q['sql'].startswith('DELETE FROM "transactions" WHERE "transactions"."id" IN')]
+        self.assertEqual(len(deletes), 3)
+        selects = [q['sql'] for q in ctx.captured_queries
+                   if q['sql'].startswith('SELECT "transactions"."id" AS "id" FROM')]
+        self.assertTrue(selects)
+        for sql in selects:
+            self.assertNotIn('ORDER BY', sql)
+        self.assertFalse(Categories.all_objects.filter(id=self.dining.id).exists())
+        self.assertEqual(Transaction.all_objects.count(), 2)
+
+    def test_rollups_written_after_a_soft_delete_are_not_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/v1/categories/{self.dining.id}/')
+        # A create whose category check passed just before the delete.
+        cache.clear()
+        self.add_transaction(self.dining, '40.00', date(2025, 1, 9))
+
+        self.assertEqual(self.client.get('/api/v1/transactions/summary/').data['total_expense'],
+                         Decimal('5.00'))
+        budget = self.client.get('/api/v1/budgets/summary/?month=1&year=2025').data
+        self.assertEqual(budget['actual_expense'], 5.0)
+        months = self.client.get('/api/v1/budgets/summary/?from=2025-01&to=2025-01').data['months']
+        self.assertEqual(months[0]['actual_expense'], 5.0)
+
+    def test_reassign_moves_transactions_with_one_update(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.delete(
+                f'/api/v1/categories/{self.dining.id}/?reassign_to={self.expense.id}'
+            )
+        self.assertEqual(response.status_code, 204)
+        updates = [q['sql'] for q in ctx.captured_queries
+                   if q['sql'].startswith('UPDATE "transactions"')]
+        self.assertEqual(len(updates), 1)
+
+        self.assertEqual(self.summary()['Food'], (Decimal('75.00'), 8))
+        self.assertFalse(Categories.all_objects.filter(id=self.dining.id).exists())
+        self.assertEqual(rollups.verify(), [])
+
+    def test_reassign_target_is_validated(self):
+        other = User.objects.create_user(username='bob', password='secret-pass-123')
+        foreign = Categories.objects.create(name='Misc', type='expense', user=other)
+        for target in (self.income.id, self.dining.id, foreign.id, 'abc'):
+            with self.subTest(target=target):
+                response = self.client.delete(
+                    f'/api/v1/categories/{self.dining.id}/?reassign_to={target}'
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertTrue(Categories.objects.filter(id=self.dining.id).exists())
+
+
+class TransactionImportTests(APITestCase):
+    def upload(self, content):
+        upload = SimpleUploadedFile('statement.csv', content.encode(), content_type='text/csv')
+        return self.client.post('/api/v1/transactions/import/', {'file': upload}, format='multipart')
+
+    def test_valid_and_invalid_rows(self):
+        response = self.upload(
+            'Date,Amount,Category,Detail\n'
+            '2025-02-01,12.34,food,Groceries\n'
+            f'2025-02-03,1500,{self.income.id},Pay\n'
+            'not-a-date,5,Food,\n'
+            '2025-02-04,3,Unknown,\n'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['error_count'], 2)
+        self.assertEqual([e['row'] for e in response.data['errors']], [4, 5])
+        self.assertIn('date', response.data['errors'][0]['errors'])
+        self.assertIn('category', response.data['errors'][1]['errors'])
+        self.assertEqual(
+            Transaction.objects.get(detail='Groceries').category_id, self.expense.id
+        )
+        self.assertEqual(rollups.verify([self.user.id]), [])
+
+    def test_categories_of_other_users_are_not_resolved(self):
+        other = User.objects.create_user(username='bob', password='secret-pass-123')
+        foreign = Categories.objects.create(name='Theirs', type='expense', user=other)
+        response = self.upload(f'date,amount,category\n2025-02-01,1,{foreign.id}\n')
+        self.assertEqual(response.data['created'], 0)
+
+    def test_missing_columns(self):
+        response = self.upload('date,amount\n2025-02-01,1\n')
+        self.assertEqual(response.status_code, 400)
+
+
+class TransactionBatchTests(APITestCase):
+    url = '/api/v1/transactions/batch/'
+
+    def post(self, operations):
+        return self.client.post(self.url, {'operations': operations}, format='json')
+
+    def test_mixed_operations_are_applied_together(self):
+        keep = self.add_transaction(self.expense, '10.00', date(2025, 3, 1))
+        drop = self.add_transaction(self.expense, '20.00', date(2025, 3, 2))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post([
+                {'op': 'create', 'data': {
+                    'amount': '5.50', 'date': '2025-03-05', 'category_id': self.expense.id,
+                }},
+                {'op': 'update', 'id': keep.id, 'data': {'amount': '12.00', 'detail': 'Lunch'}},
+                {'op': 'delete', 'id': drop.id},
+            ])
+        self.assertEqual(response.status_code, 200)
+        statuses = [r['status'] for r in response.data['results']]
+        self.assertEqual(statuses, ['created', 'updated', 'deleted'])
+        self.assertEqual(response.data['results'][1]['data']['detail'], 'Lunch')
+        self.assertEqual(response.data['results'][0]['data']['category']['name'], 'Food')
+        self.assertFalse(Transaction.objects.filter(id=drop.id).exists())
+        self.assertEqual(rollups.verify([self.user.id]), [])
+        self.assertLess(len(queries), 15)
+
+    def test_results_survive_a_concurrent_category_delete(self):
+        apply = rollups.RollupDelta.apply
+
+        def apply_then_delete_category(delta):
+            apply(delta)
+            Categories.objects.filter(id=self.expense.id).update(deleted_at=timezone.now())
+
+        with mock.patch.object(rollups.RollupDelta, 'apply', apply_then_delete_category):
+            response = self.post([{'op': 'create', 'data': {
+                'amount': '5.50', 'date': '2025-03-05', 'category_id': self.expense.id,
+            }}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['data']['amount'], '5.50')
+
+    def test_one_invalid_operation_rolls_back_the_batch(self):
+        txn = self.add_transaction(self.expense, '10.00', date(2025, 3, 1))
+        other = User.objects.create_user(username='bob', password='secret-pass-123')
+        foreign = Categories.objects.create(name='Theirs', type='expense', user=other)
+        response = self.post([
+            {'op': 'delete', 'id': txn.id},
+            {'op': 'create', 'data': {
+                'amount': '1.00', 'date': '2025-03-02', 'category_id': foreign.id,
+            }},
+            {'op': 'update', 'id': 999999, 'data': {'amount': 'abc'}},
+        ])
+        self.assertEqual(response.status_code, 400)
+        results = response.data['results']
+        self.assertEqual([r['status'] for r in results], ['skipped', 'error', 'error'])
+        self.assertIn('category_id', results[1]['errors'])
+        self.assertEqual(set(results[2]['errors']), {'id', 'amount'})
+        self.assertTrue(Transaction.objects.filter(id=txn.id).exists())
+
+    def test_duplicate_targets_are_rejected(self):
+        txn = self.add_transaction(self.expense, '10.00', date(2025, 3, 1))
+        response = self.post([{'op': 'delete', 'id': txn.id}, {'op': 'delete', 'id': txn.id}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['results'][1]['status'], 'error')
+
+    def test_malformed_batch(self):
+        self.assertEqual(self.post([]).status_code, 400)
+        response = self.client.post(self.url, [{'op': 'delete', 'id': 1}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.data)
+
+    def test_batch_invalidates_cached_list(self):
+        self.client.get('/api/v1/transactions/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post([{'op': 'create', 'data': {
+                'amount': '5.00', 'date': '2025-03-05', 'category_id': self.income.id,
+            }}])
+        self.assertEqual(len(self.client.get('/api/v1/transactions/').data), 1)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Runs against a second SQLite database standing in for a lagging
+    replica. It is added here rather than in settings so the test runner
+    does not try to create it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        connections.settings[REPLICA] = {
+            **connections['default'].settings_dict,
+            'NAME': os.path.join(cls.replica_dir.name, 'replica.sqlite3'),
+        }
+        cls.databases = {'default', REPLICA}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.replica_dir.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='alice', password='secret-pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.expense = Categories.objects.create(name='Food', type='expense', user=self.user)
+        self.add_transaction('10.00')
+        self.replicate()
+        self.unreplicated = self.add_transaction('20.00')
+
+    def add_transaction(self, amount):
+        txn = Transaction.objects.create(
+            user=self.user, category=self.expense, amount=Decimal(amount), date=date(2025, 3, 1)
+        )
+        rollups.record_created(txn)
+        return txn
+
+    def replicate(self):
+        for alias in ('default', REPLICA):
+            connections[alias].ensure_connection()
+        connections['default'].connection.backup(connections[REPLICA].connection)
+
+    def test_reporting_reads_use_the_replica(self):
+        self.assertEqual(len(self.client.get('/api/v1/transactions/').data), 1)
+        summary = self.client.get('/api/v1/budgets/summary/?month=3&year=2025').data
+        self.assertEqual(summary['actual_expense'], 10.0)
+        export = self.client.get('/api/v1/transactions/export/')
+        self.assertEqual(len(b''.join(export.streaming_content).splitlines()), 2)
+
+        response = self.client.get(f'/api/v1/transactions/{self.unreplicated.id}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_reads_stick_to_the_primary_after_a_write(self):
+        self.client.post('/api/v1/transactions/', {
+            'category_id': self.expense.id, 'amount': '5.00', 'date': '2025-03-02',
+        })
+        self.assertEqual(len(self.client.get('/api/v1/transactions/').data), 3)
+        summary = self.client.get('/api/v1/budgets/summary/?month=3&year=2025').data
+        self.assertEqual(summary['actual_expense'], 35.0)
+
+        cache.delete(sticky_key(self.user.id))
+        self.assertEqual(len(self.client.get('/api/v1/transactions/').data), 1)
@@ -0,0 +1,110 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+TRUNCATORS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+GROUPINGS = {
+    'type': ('category__type',),
+    'category': ('category_id', 'category__name', 'category__type'),
+}
+MAX_BUCKETS = 3660
+# Archived rows are shaped like transaction_reader.values().
+ARCHIVED_KEYS = {'category_id': 'category__id'}
+
+
+def bucket_start(day, interval):
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, interval):
+    if interval == 'week':
+        return day + timedelta(days=7)
+    if interval == 'month':
+        return day.replace(year=day.year + 1, month=1) if day.month == 12 else day.replace(month=day.month + 1)
+    return day + timedelta(days=1)
+
+
+def bucket_range(start, end, interval):
+    buckets = []
+    current = bucket_start(start, interval)
+    while current <= end:
+        buckets.append(current)
+        if len(buckets) > MAX_BUCKETS:
+            raise ValueError("Too many buckets; narrow the range or use a wider interval")
+        current = next_bucket(current, interval)
+    return buckets
+
+
+def bucket_archived(rows, interval, keys):
+    totals = defaultdict(Decimal)
+    for row in rows:
+        group = tuple(row[ARCHIVED_KEYS.get(name, name)] for name in keys)
+        totals[(bucket_start(row['date'], interval), group)] += row['amount']
+    return [
+        {'bucket': bucket, **dict(zip(keys, group)), 'total': total}
+        for (bucket, group), total in totals.items()
+    ]
+
+
+def build_timeseries(transactions, interval, group_by, date_range=None, archived=()):
+    """
+    Sum amounts per (bucket, group) in one grouped query, then lay the
+    result out as one bucket axis plus one zero-filled value column per
+    series. ``archived`` rows are bucketed in Python and added in.
+    """
+    keys = GROUPINGS[group_by]
+    if date_range:
+        # Size the axis before querying so an oversized range fails fast.
+        buckets = bucket_range(date_range[0], date_range[1], interval)
+        transactions = transactions.filter(date__range=date_range)
+    rows = list(
+        transactions
+        .annotate(bucket=TRUNCATORS[interval]('date'))
+        .values('bucket', *keys)
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+    rows.extend(bucket_archived(archived, interval, keys))
+
+    if not date_range:
+        if not rows:
+            return {'interval': interval, 'group_by': group_by, 'buckets': [], 'series': []}
+        start = min(row['bucket'] for row in rows)
+        end = max(row['bucket'] for row in rows)
+        buckets = bucket_range(start, end, interval)
+    position = {bucket: index for index, bucket in enumerate(buckets)}
+
+    series = {}
+    for row in rows:
+        key = tuple(row[name] for name in keys)
+        if key not in series:
+            series[key] = [0.0] * len(buckets)
+        series[key][position[row['bucket']]] += float(row['total'])
+
+    columns = []
+    for key in sorted(series, key=lambda k: k[::-1]):
+        if group_by == 'category':
+            category_id, name, category_type = key
+            column = {'id': category_id, 'name': name, 'type': category_type}
+        else:
+            column = {'type': key[0]}
+        column['values'] = series[key]
+        columns.append(column)
+
+    return {
+        'interval': interval,
+        'group_by': group_by,
+        'buckets': [bucket.isoformat() for bucket in buckets],
+        'series': columns,
+    }
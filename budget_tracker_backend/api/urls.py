@@ -2,14 +2,22 @@ from django.urls import path
 from .views import (
     BudgetAPIView, 
     BudgetDetailAPIView, 
+    BudgetForecastAPIView,
     BudgetSummaryAPIView, 
     CategoryAPIView, 
+    CategoryBudgetAPIView,
+    CategoryBudgetDetailAPIView,
+    CategoryBudgetSummaryAPIView,
     CategoryDetailAPIView, 
     LoginView, 
     RefreshTokenView, 
     TransactionAPIView, 
+    TransactionBatchAPIView,
     TransactionDetailAPIView, 
-    TransactionSummaryAPIView
+    TransactionExportAPIView,
+    TransactionImportAPIView,
+    TransactionSummaryAPIView,
+    TransactionTimeSeriesAPIView
 )
 
 urlpatterns = [
@@ -19,8 +27,16 @@ urlpatterns = [
     path('categories/<int:pk>/', CategoryDetailAPIView.as_view(), name='category-detail'),
     path('transactions/', TransactionAPIView.as_view(), name='transactions'),
     path('transactions/<int:pk>/', TransactionDetailAPIView.as_view(), name='transaction-detail'),
-    path('transactions/summary/', TransactionSummaryAPIView.as_view()),
+    path('transactions/summary/', TransactionSummaryAPIView.as_view(), name='transaction-summary'),
+    path('transactions/export/', TransactionExportAPIView.as_view(), name='transaction-export'),
+    path('transactions/import/', TransactionImportAPIView.as_view(), name='transaction-import'),
+    path('transactions/batch/', TransactionBatchAPIView.as_view(), name='transaction-batch'),
+    path('transactions/timeseries/', TransactionTimeSeriesAPIView.as_view(), name='transaction-timeseries'),
     path('budgets/', BudgetAPIView.as_view(), name='budget-list'),
     path('budgets/<int:id>/', BudgetDetailAPIView.as_view(), name='budget-detail'),
     path('budgets/summary/', BudgetSummaryAPIView.as_view(), name='budget-summary'),
+    path('budgets/forecast/', BudgetForecastAPIView.as_view(), name='budget-forecast'),
+    path('category-budgets/', CategoryBudgetAPIView.as_view(), name='category-budget-list'),
+    path('category-budgets/<int:id>/', CategoryBudgetDetailAPIView.as_view(), name='category-budget-detail'),
+    path('category-budgets/summary/', CategoryBudgetSummaryAPIView.as_view(), name='category-budget-summary'),
 ]
\ No newline at end of file
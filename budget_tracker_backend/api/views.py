@@ -1,17 +1,175 @@
+import functools
+import heapq
 from datetime import date, datetime
+from asgiref.sync import sync_to_async
 from django.contrib.auth import authenticate
-from django.db.models import Sum
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction as db_transaction
+from django.db.models import Count, FilteredRelation, Q, Sum
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
 from rest_framework import status, permissions
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
-from .models import Budget, Categories, Transaction
-from .serializers import BudgetSerializer, CategoriesSerializer, TransactionSerializer
+from . import archive, forecast, purge, rollups
+from .async_views import AsyncAPIView, gather_queries
+from .batch import MAX_BATCH_OPERATIONS, OPERATIONS, BatchError, apply_batch
+from .cache import (
+    acached_user_data,
+    bump_data_version,
+    cached_user_data,
+    etag_from_data_version,
+)
+from .docs import openapi, swagger_auto_schema
+from .exports import aiterate, stream_csv, stream_ndjson
+from .fast_serializers import (
+    budget_reader,
+    category_budget_reader,
+    category_reader,
+    transaction_reader,
+)
+from .imports import CSVImportError, import_transactions
+from .models import Budget, Categories, CategoryBudget, MonthlySummary, Transaction
+from .pagination import TransactionCursorPagination
+from .routers import pinned, reads_from_replica
+from .search import search_transactions
+from .serializers import (
+    BudgetSerializer,
+    CategoriesSerializer,
+    CategoryBudgetSerializer,
+    TransactionSerializer,
+)
+from .timeseries import GROUPINGS, TRUNCATORS, build_timeseries
+
+
+def parse_date_range(params):
+    start_date = params.get('startDate')
+    end_date = params.get('endDate')
+    if start_date and end_date:
+        try:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+            return start_date, end_date
+        except ValueError:
+            pass
+    return None
+
+
+MAX_SUMMARY_MONTHS = 120
+
+
+def parse_month_range(params):
+    try:
+        start = datetime.strptime(params.get('from', ''), '%Y-%m')
+        end = datetime.strptime(params.get('to', ''), '%Y-%m')
+    except ValueError:
+        raise ValueError("from and to must both be given as YYYY-MM")
+    start, end = (start.year, start.month), (end.year, end.month)
+    span = (end[0] - start[0]) * 12 + end[1] - start[1] + 1
+    if span < 1:
+        raise ValueError("from must not be after to")
+    if span > MAX_SUMMARY_MONTHS:
+        raise ValueError(f"Range is limited to {MAX_SUMMARY_MONTHS} months")
+    return start, end
+
+
+def parse_month(params):
+    today = date.today()
+    try:
+        month = int(params.get('month', today.month))
+        year = int(params.get('year', today.year))
+    except ValueError:
+        raise ValueError("month and year must be integers")
+    if not 1 <= month <= 12:
+        raise ValueError("month must be between 1 and 12")
+    if not date.min.year <= year <= date.max.year:
+        raise ValueError(f"year must be between {date.min.year} and {date.max.year}")
+    return year, month
+
+
+def filter_transactions(transactions, params):
+    category_id = params.get('category')
+    date_range = parse_date_range(params)
+    min_amount = params.get('minAmount')
+    max_amount = params.get('maxAmount')
+
+    if category_id:
+        transactions = transactions.filter(category_id=category_id)
+
+    if date_range:
+        transactions = transactions.filter(date__range=date_range)
+
+    if min_amount:
+        try:
+            transactions = transactions.filter(amount__gte=float(min_amount))
+        except ValueError:
+            pass
+    if max_amount:
+        try:
+            transactions = transactions.filter(amount__lte=float(max_amount))
+        except ValueError:
+            pass
+    return transactions
+
+def dated(name):
+    # For responses that change with today's date as well as with the data.
+    return f'{name}:{date.today().isoformat()}'
+
+
+def projection_fields(budget_amount, projected):
+    projected = round(projected, 2)
+    return {
+        "projected_expense": projected,
+        "over_budget": bool(budget_amount) and projected > float(budget_amount),
+    }
+
+
+def parse_amount(value):
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def archived_transactions(user, params):
+    """Archived rows matching the same params as filter_transactions, newest first."""
+    category_id = params.get('category')
+    if category_id:
+        try:
+            category_id = int(category_id)
+        except ValueError:
+            return iter(())
+    return archive.read_rows(
+        user,
+        category_id=category_id or None,
+        date_range=parse_date_range(params),
+        min_amount=parse_amount(params.get('minAmount')),
+        max_amount=parse_amount(params.get('maxAmount')),
+    )
+
+
+def newest_first(row):
+    return (row['date'], row['id'])
+
+
+def add_archived_totals(rows, archived):
+    by_category = {row['category_id']: dict(row) for row in rows}
+    for category_id, (name, category_type, total, count) in archived.items():
+        row = by_category.setdefault(category_id, {
+            'category_id': category_id,
+            'category__name': name,
+            'category__type': category_type,
+            'category_total': 0,
+            'entries': 0,
+        })
+        row['category_total'] += total
+        row['entries'] += count
+    return sorted(by_category.values(), key=lambda r: (r['category__type'], r['category__name']))
+
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
@@ -84,7 +242,7 @@ class RefreshTokenView(TokenRefreshView):
             return Response({'access': new_access})
         return response
         
-class CategoryAPIView(APIView):
+class CategoryAPIView(AsyncAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
@@ -94,10 +252,13 @@ class CategoryAPIView(APIView):
             401: "Unauthorized"
         }
     )
-    def get(self, request):
-        categories = Categories.objects.filter(user=request.user)
-        serializer = CategoriesSerializer(categories, many=True)
-        return Response(serializer.data)
+    @etag_from_data_version('categories')
+    @reads_from_replica
+    async def get(self, request):
+        async def build():
+            return await category_reader.aread(Categories.objects.filter(user=request.user))
+
+        return Response(await acached_user_data(request, 'categories', build))
 
     @swagger_auto_schema(
         operation_description="Create a new category",
@@ -114,6 +275,7 @@ class CategoryAPIView(APIView):
         serializer = CategoriesSerializer(data=data)
         if serializer.is_valid():
             serializer.save(user=request.user)
+            bump_data_version(request.user.id)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -139,24 +301,58 @@ class CategoryDetailAPIView(APIView):
         serializer = CategoriesSerializer(category, data=request.data, partial=partial)
         if serializer.is_valid():
             serializer.save()
+            bump_data_version(request.user.id)
+            forecast.forget_user(request.user.id)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @swagger_auto_schema(
-        operation_description="Delete a category",
+        operation_description=(
+            "Delete a category. It and its transactions disappear at once and are "
+            "removed later in batches; with reassign_to, its transactions move to "
+            "that category instead"
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                'reassign_to',
+                openapi.IN_QUERY,
+                description="ID of another category of the same type to move the transactions to",
+                type=openapi.TYPE_INTEGER
+            ),
+        ],
         responses={
             204: "No content",
+            400: "Invalid reassign_to",
             401: "Unauthorized",
             404: "Category not found"
         }
     )
     def delete(self, request, pk):
         category = self.get_object(pk, request.user)
-        category.delete()
+        target_id = request.query_params.get('reassign_to')
+        if not target_id:
+            purge.soft_delete(category)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        try:
+            target = (
+                Categories.objects
+                .filter(user=request.user, type=category.type, pk=int(target_id))
+                .exclude(pk=category.pk)
+                .first()
+            )
+        except ValueError:
+            target = None
+        if target is None:
+            return Response(
+                {'error': 'reassign_to must be another category of the same type'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        purge.reassign(category, target)
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 
-class TransactionAPIView(APIView):
+class TransactionAPIView(AsyncAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
@@ -192,45 +388,56 @@ class TransactionAPIView(APIView):
                 description="Maximum amount",
                 type=openapi.TYPE_NUMBER
             ),
+            openapi.Parameter(
+                'limit',
+                openapi.IN_QUERY,
+                description="Page size (max 500); enables cursor pagination",
+                type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description="Opaque cursor taken from a previous page's next/previous link",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'search',
+                openapi.IN_QUERY,
+                description=(
+                    "Words to find in the detail, matched as prefixes; returns the best "
+                    "matches first, up to limit, instead of a page. Archived transactions "
+                    "are not searched"
+                ),
+                type=openapi.TYPE_STRING
+            ),
         ],
         responses={
             200: TransactionSerializer(many=True),
             401: "Unauthorized"
         }
     )
-    def get(self, request):
-        transactions = Transaction.objects.filter(user=request.user).select_related('category')
-        
-        category_id = request.query_params.get('category')
-        start_date = request.query_params.get('startDate')
-        end_date = request.query_params.get('endDate')
-        min_amount = request.query_params.get('minAmount')
-        max_amount = request.query_params.get('maxAmount')
-        
-        if category_id:
-            transactions = transactions.filter(category_id=category_id)
-        
-        if start_date and end_date:
-            try:
-                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-                transactions = transactions.filter(date__range=[start_date, end_date])
-            except ValueError:
-                pass
-        
-        if min_amount:
-            try:
-                transactions = transactions.filter(amount__gte=float(min_amount))
-            except ValueError:
-                pass
-        if max_amount:
-            try:
-                transactions = transactions.filter(amount__lte=float(max_amount))
-            except ValueError:
-                pass
-        transactions = transactions.order_by('-date')
-        serializer = TransactionSerializer(transactions, many=True)
-        return Response(serializer.data)
+    @etag_from_data_version('transactions')
+    @reads_from_replica
+    async def get(self, request):
+        transactions = Transaction.objects.filter(user=request.user)
+        transactions = filter_transactions(transactions, request.query_params)
+
+        paginator = TransactionCursorPagination()
+        query = request.query_params.get('search', '').strip()
+        if query:
+            matches = search_transactions(transactions, request.user.id, query)
+            matches = matches.order_by('-search_rank', '-date', '-id')
+            return Response(await transaction_reader.aread(matches[:paginator.get_page_size(request)]))
+
+        archived = await sync_to_async(archived_transactions)(request.user, request.query_params)
+        if paginator.is_requested(request):
+            rows = transaction_reader.values(transactions)
+            page = await sync_to_async(paginator.paginate_queryset)(rows, request, archived)
+            return paginator.get_paginated_response(transaction_reader.to_representation(page))
+
+        rows = [row async for row in transaction_reader.values(transactions.order_by('-date', '-id'))]
+        rows = heapq.merge(rows, archived, key=newest_first, reverse=True)
+        return Response(transaction_reader.to_representation(rows))
 
     @swagger_auto_schema(
         operation_description="Create a new transaction",
@@ -246,15 +453,227 @@ class TransactionAPIView(APIView):
         data['user'] = request.user.id
         serializer = TransactionSerializer(data=data)
         if serializer.is_valid():
-            serializer.save(user=request.user)
+            with db_transaction.atomic():
+                instance = serializer.save(user=request.user)
+                bump_data_version(request.user.id)
+                rollups.record_created(instance)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+class TransactionExportAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Stream all matching transactions as CSV or NDJSON",
+        manual_parameters=[
+            openapi.Parameter(
+                'fileFormat',
+                openapi.IN_QUERY,
+                description="Export format",
+                type=openapi.TYPE_STRING,
+                enum=['csv', 'ndjson'],
+                default='csv'
+            ),
+            openapi.Parameter(
+                'category',
+                openapi.IN_QUERY,
+                description="Filter by category ID",
+                type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'startDate',
+                openapi.IN_QUERY,
+                description="Start date (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'endDate',
+                openapi.IN_QUERY,
+                description="End date (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'minAmount',
+                openapi.IN_QUERY,
+                description="Minimum amount",
+                type=openapi.TYPE_NUMBER
+            ),
+            openapi.Parameter(
+                'maxAmount',
+                openapi.IN_QUERY,
+                description="Maximum amount",
+                type=openapi.TYPE_NUMBER
+            ),
+        ],
+        responses={
+            200: "Streamed file",
+            400: "Unsupported format",
+            401: "Unauthorized"
+        }
+    )
+    @reads_from_replica
+    def get(self, request):
+        file_format = request.query_params.get('fileFormat', 'csv')
+        if file_format not in ('csv', 'ndjson'):
+            return Response({'error': 'Unsupported format'}, status=status.HTTP_400_BAD_REQUEST)
+
+        transactions = Transaction.objects.filter(user=request.user)
+        transactions = pinned(filter_transactions(transactions, request.query_params))
+
+        archived = archived_transactions(request.user, request.query_params)
+        if file_format == 'csv':
+            content, content_type = stream_csv(transactions, archived), 'text/csv'
+        else:
+            content, content_type = stream_ndjson(transactions, archived), 'application/x-ndjson'
+        if isinstance(request._request, ASGIRequest):
+            content = aiterate(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="transactions.{file_format}"'
+        return response
+
+class TransactionImportAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Import transactions from a CSV file with date, amount, category "
+            "(name or ID) and optional detail columns"
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                'file',
+                openapi.IN_FORM,
+                description="CSV file",
+                type=openapi.TYPE_FILE,
+                required=True
+            ),
+        ],
+        responses={
+            201: openapi.Response(
+                description="Import report",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'created': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'error_count': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'errors': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    'row': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                    'errors': openapi.Schema(type=openapi.TYPE_OBJECT),
+                                }
+                            )
+                        ),
+                    }
+                )
+            ),
+            400: "Missing or unreadable file",
+            401: "Unauthorized"
+        }
+    )
+    def post(self, request):
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is None:
+            return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            report = import_transactions(request.user, uploaded_file)
+        except CSVImportError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        bump_data_version(request.user.id)
+        return Response(report, status=status.HTTP_201_CREATED)
+
+class TransactionBatchAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Apply a list of create, update and delete operations atomically. "
+            "If any operation fails validation nothing is written and every "
+            "operation is reported as error or skipped"
+        ),
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['operations'],
+            properties={
+                'operations': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        required=['op'],
+                        properties={
+                            'op': openapi.Schema(type=openapi.TYPE_STRING, enum=list(OPERATIONS)),
+                            'id': openapi.Schema(
+                                type=openapi.TYPE_INTEGER,
+                                description="Transaction ID for update and delete"
+                            ),
+                            'data': openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                description="amount, date, detail and category_id"
+                            ),
+                        }
+                    ),
+                    max_items=MAX_BATCH_OPERATIONS
+                ),
+            }
+        ),
+        responses={
+            200: openapi.Response(
+                description="Per-operation results",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'results': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    'index': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                    'op': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'status': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'id': openapi.Schema(
+                                        type=openapi.TYPE_INTEGER,
+                                        description="ID of the deleted transaction"
+                                    ),
+                                    'data': openapi.Schema(
+                                        type=openapi.TYPE_OBJECT,
+                                        description="The created or updated transaction"
+                                    ),
+                                    'errors': openapi.Schema(type=openapi.TYPE_OBJECT),
+                                }
+                            )
+                        ),
+                    }
+                )
+            ),
+            400: "Malformed batch or failed operations",
+            401: "Unauthorized"
+        }
+    )
+    def post(self, request):
+        operations = request.data.get('operations') if isinstance(request.data, dict) else None
+        try:
+            ok, results = apply_batch(request.user, operations)
+        except BatchError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if not ok:
+            return Response({'results': results}, status=status.HTTP_400_BAD_REQUEST)
+        bump_data_version(request.user.id)
+        return Response({'results': results})
+
 class TransactionDetailAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_object(self, pk, user):
-        return get_object_or_404(Transaction, pk=pk, user=user)
+    def get_object(self, pk, user, for_update=False):
+        queryset = Transaction.objects
+        if for_update:
+            # Lock only the transaction row, not the category it joins to.
+            queryset = Transaction.all_objects.select_for_update(of=('self',)).filter(
+                category__deleted_at__isnull=True
+            )
+        return get_object_or_404(queryset, pk=pk, user=user)
 
     @swagger_auto_schema(
         operation_description="Retrieve a transaction",
@@ -280,11 +699,15 @@ class TransactionDetailAPIView(APIView):
         }
     )
     def put(self, request, pk):
-        transaction = self.get_object(pk, request.user)
-        serializer = TransactionSerializer(transaction, data=request.data, partial=True)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
+        with db_transaction.atomic():
+            transaction = self.get_object(pk, request.user, for_update=True)
+            before = rollups.snapshot(transaction)
+            serializer = TransactionSerializer(transaction, data=request.data, partial=True)
+            if serializer.is_valid():
+                instance = serializer.save()
+                bump_data_version(request.user.id)
+                rollups.record_updated(before, instance)
+                return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @swagger_auto_schema(
@@ -296,11 +719,14 @@ class TransactionDetailAPIView(APIView):
         }
     )
     def delete(self, request, pk):
-        transaction = self.get_object(pk, request.user)
-        transaction.delete()
+        with db_transaction.atomic():
+            transaction = self.get_object(pk, request.user, for_update=True)
+            rollups.record_deleted(transaction)
+            transaction.delete()
+            bump_data_version(request.user.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
     
-class BudgetAPIView(APIView):
+class BudgetAPIView(AsyncAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
@@ -310,10 +736,11 @@ class BudgetAPIView(APIView):
             401: "Unauthorized"
         }
     )
-    def get(self, request):
+    @etag_from_data_version('budgets')
+    @reads_from_replica
+    async def get(self, request):
         budgets = Budget.objects.filter(user=request.user)
-        serializer = BudgetSerializer(budgets, many=True)
-        return Response(serializer.data)
+        return Response(await budget_reader.aread(budgets))
 
     @swagger_auto_schema(
         operation_description="Create a new budget",
@@ -330,6 +757,7 @@ class BudgetAPIView(APIView):
         serializer = BudgetSerializer(data=data)
         if serializer.is_valid():
             serializer.save(user=request.user)
+            bump_data_version(request.user.id)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -354,6 +782,7 @@ class BudgetDetailAPIView(APIView):
         serializer = BudgetSerializer(budget, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            bump_data_version(request.user.id)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -368,13 +797,34 @@ class BudgetDetailAPIView(APIView):
     def delete(self, request, id):
         budget = self.get_object(id, request.user)
         budget.delete()
+        bump_data_version(request.user.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
     
-class TransactionSummaryAPIView(APIView):
+class TransactionSummaryAPIView(AsyncAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
         operation_description="Get summary of transactions (income, expense, balance)",
+        manual_parameters=[
+            openapi.Parameter(
+                'startDate',
+                openapi.IN_QUERY,
+                description="Start date (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'endDate',
+                openapi.IN_QUERY,
+                description="End date (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'breakdown',
+                openapi.IN_QUERY,
+                description="Set to 'category' to include per-category totals",
+                type=openapi.TYPE_STRING
+            ),
+        ],
         responses={
             200: openapi.Response(
                 description="Transaction summary",
@@ -384,28 +834,201 @@ class TransactionSummaryAPIView(APIView):
                         'total_income': openapi.Schema(type=openapi.TYPE_NUMBER),
                         'total_expense': openapi.Schema(type=openapi.TYPE_NUMBER),
                         'balance': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'categories': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    'id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                    'name': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'type': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'total': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                    'count': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                }
+                            )
+                        ),
                     }
                 )
             ),
             401: "Unauthorized"
         }
     )
-    def get(self, request):
-        transactions = Transaction.objects.filter(user=request.user)
-        total_income = sum(t.amount for t in transactions if t.category.type == 'income')
-        total_expense = sum(t.amount for t in transactions if t.category.type == 'expense')
+    @etag_from_data_version('transaction-summary')
+    @reads_from_replica
+    async def get(self, request):
+        summary = await acached_user_data(
+            request, 'transaction-summary', lambda: self.summarize(request)
+        )
+        return Response(summary)
+
+    async def summarize(self, request):
+        # Whole-history totals come from the monthly rollup; an explicit date
+        # range may cut through a month, so it aggregates raw rows instead.
+        date_range = parse_date_range(request.query_params)
+        archived = {}
+        if date_range:
+            rows = Transaction.objects.filter(user=request.user, date__range=date_range)
+            amount_field, entries = 'amount', Count('id')
+            archived = await sync_to_async(archive.archived_totals)(request.user, date_range)
+        else:
+            # A write racing a soft delete can leave a rollup row behind
+            # for the deleted category until it is purged.
+            rows = MonthlySummary.objects.filter(user=request.user, category__deleted_at__isnull=True)
+            amount_field, entries = 'total', Sum('count')
+
+        if request.query_params.get('breakdown') == 'category':
+            grouped = (
+                rows
+                .values('category_id', 'category__name', 'category__type')
+                .annotate(category_total=Sum(amount_field), entries=entries)
+                .filter(entries__gt=0)
+                .order_by('category__type', 'category__name')
+            )
+            rows = [row async for row in grouped]
+            if archived:
+                rows = add_archived_totals(rows, archived)
+            total_income = sum(
+                (r['category_total'] for r in rows if r['category__type'] == 'income'), 0
+            )
+            total_expense = sum(
+                (r['category_total'] for r in rows if r['category__type'] == 'expense'), 0
+            )
+            return {
+                "total_income": total_income,
+                "total_expense": total_expense,
+                "balance": total_income - total_expense,
+                "categories": [
+                    {
+                        "id": r['category_id'],
+                        "name": r['category__name'],
+                        "type": r['category__type'],
+                        "total": r['category_total'],
+                        "count": r['entries'],
+                    }
+                    for r in rows
+                ]
+            }
+
+        totals = await rows.aaggregate(
+            total_income=Sum(amount_field, filter=Q(category__type='income')),
+            total_expense=Sum(amount_field, filter=Q(category__type='expense')),
+        )
+        total_income = totals['total_income'] or 0
+        total_expense = totals['total_expense'] or 0
+        for _, category_type, total, _ in archived.values():
+            if category_type == 'income':
+                total_income += total
+            else:
+                total_expense += total
         balance = total_income - total_expense
-        return Response({
+        return {
             "total_income": total_income,
             "total_expense": total_expense,
             "balance": balance
-        })
+        }
     
-class BudgetSummaryAPIView(APIView):
+class TransactionTimeSeriesAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_description="Get budget summary for a specific month/year",
+        operation_description=(
+            "Spending per day, week or month, grouped by income/expense type or by "
+            "category. Values are returned as one array per series aligned with 'buckets'."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                'interval',
+                openapi.IN_QUERY,
+                description="Bucket width",
+                type=openapi.TYPE_STRING,
+                enum=list(TRUNCATORS),
+                default='month'
+            ),
+            openapi.Parameter(
+                'groupBy',
+                openapi.IN_QUERY,
+                description="Series grouping",
+                type=openapi.TYPE_STRING,
+                enum=list(GROUPINGS),
+                default='type'
+            ),
+            openapi.Parameter(
+                'startDate',
+                openapi.IN_QUERY,
+                description="Start date (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'endDate',
+                openapi.IN_QUERY,
+                description="End date (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Time series",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'interval': openapi.Schema(type=openapi.TYPE_STRING),
+                        'group_by': openapi.Schema(type=openapi.TYPE_STRING),
+                        'buckets': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_STRING)
+                        ),
+                        'series': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    'id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                    'name': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'type': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'values': openapi.Schema(
+                                        type=openapi.TYPE_ARRAY,
+                                        items=openapi.Schema(type=openapi.TYPE_NUMBER)
+                                    ),
+                                }
+                            )
+                        ),
+                    }
+                )
+            ),
+            400: "Bad request",
+            401: "Unauthorized"
+        }
+    )
+    @etag_from_data_version('transaction-timeseries')
+    @reads_from_replica
+    def get(self, request):
+        interval = request.query_params.get('interval', 'month')
+        group_by = request.query_params.get('groupBy', 'type')
+        if interval not in TRUNCATORS or group_by not in GROUPINGS:
+            return Response({'error': 'Invalid interval or groupBy'}, status=status.HTTP_400_BAD_REQUEST)
+
+        transactions = Transaction.objects.filter(user=request.user)
+        date_range = parse_date_range(request.query_params)
+        try:
+            series = cached_user_data(
+                request, 'transaction-timeseries',
+                lambda: build_timeseries(
+                    transactions, interval, group_by, date_range,
+                    archive.read_rows(request.user, date_range=date_range),
+                )
+            )
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(series)
+    
+class BudgetSummaryAPIView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Get budget summary for a specific month/year, or for every month "
+            "between from and to (inclusive)"
+        ),
         manual_parameters=[
             openapi.Parameter(
                 'month',
@@ -421,10 +1044,22 @@ class BudgetSummaryAPIView(APIView):
                 type=openapi.TYPE_INTEGER,
                 default=date.today().year
             ),
+            openapi.Parameter(
+                'from',
+                openapi.IN_QUERY,
+                description="First month of a range (YYYY-MM)",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'to',
+                openapi.IN_QUERY,
+                description="Last month of a range (YYYY-MM)",
+                type=openapi.TYPE_STRING
+            ),
         ],
         responses={
             200: openapi.Response(
-                description="Budget summary",
+                description="Budget summary; with from/to, a 'months' list of these objects",
                 schema=openapi.Schema(
                     type=openapi.TYPE_OBJECT,
                     properties={
@@ -433,36 +1068,390 @@ class BudgetSummaryAPIView(APIView):
                         'budget': openapi.Schema(type=openapi.TYPE_NUMBER),
                         'actual_expense': openapi.Schema(type=openapi.TYPE_NUMBER),
                         'remaining': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'projected_expense': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'over_budget': openapi.Schema(type=openapi.TYPE_BOOLEAN),
                     }
                 )
             ),
+            400: "Invalid month, year or range",
             401: "Unauthorized"
         }
     )
-    def get(self, request):
-        user = request.user
-        month = int(request.query_params.get("month", date.today().month))
-        year = int(request.query_params.get("year", date.today().year))
-
-        budget = Budget.objects.filter(user=user, month=month, year=year).first()
-        budget_amount = budget.amount if budget else 0
-
-        transactions = Transaction.objects.filter(
-            user=user,
-            date__month=month,
-            date__year=year,
-            category__type='expense'
+    @etag_from_data_version(functools.partial(dated, 'budget-summary'))
+    @reads_from_replica
+    async def get(self, request):
+        if 'from' in request.query_params or 'to' in request.query_params:
+            try:
+                start, end = parse_month_range(request.query_params)
+            except ValueError as exc:
+                return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+            summary = await acached_user_data(
+                request, dated('budget-summary'),
+                lambda: self.summarize_range(request.user, start, end)
+            )
+            return Response(summary)
+
+        try:
+            year, month = parse_month(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        summary = await acached_user_data(
+            request, dated('budget-summary'), lambda: self.summarize(request.user, year, month)
+        )
+        return Response(summary)
+
+    async def summarize_range(self, user, start, end):
+        in_range = (
+            (Q(year__gt=start[0]) | Q(year=start[0], month__gte=start[1]))
+            & (Q(year__lt=end[0]) | Q(year=end[0], month__lte=end[1]))
         )
 
-        total_expense = transactions.aggregate(total=Sum('amount'))['total'] or 0
+        def load_budgets():
+            return dict(
+                ((year, month), amount)
+                for year, month, amount in Budget.objects.filter(in_range, user=user)
+                .values_list('year', 'month', 'amount')
+            )
+
+        def load_expenses():
+            return dict(
+                ((row['year'], row['month']), row['total_expense'])
+                for row in MonthlySummary.objects.filter(
+                    in_range, user=user, category__type='expense', category__deleted_at__isnull=True
+                )
+                .values('year', 'month')
+                .annotate(total_expense=Sum('total'))
+                .order_by()
+            )
+
+        today = date.today()
+        loads = [load_budgets, load_expenses]
+        if forecast.needs_forecast(*end, today):
+            loads.append(lambda: forecast.load_forecast(user, today))
+        budgets, expenses, *projection = await gather_queries(*loads)
+        projection = projection[0] if projection else forecast.Forecast([])
+
+        months = []
+        year, month = start
+        while (year, month) <= end:
+            budget_amount = budgets.get((year, month), 0)
+            total_expense = expenses.get((year, month)) or 0
+            months.append({
+                "month": month,
+                "year": year,
+                "budget": float(budget_amount),
+                "actual_expense": float(total_expense),
+                "remaining": float(budget_amount - total_expense),
+                **projection_fields(
+                    budget_amount, projection.project(year, month, total_expense, today)
+                ),
+            })
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        return {
+            "from": f"{start[0]:04d}-{start[1]:02d}",
+            "to": f"{end[0]:04d}-{end[1]:02d}",
+            "months": months
+        }
+
+    async def summarize(self, user, year, month):
 
-        return Response({
+        def load_budget():
+            budget = Budget.objects.filter(user=user, month=month, year=year).first()
+            return budget.amount if budget else 0
+
+        def load_expense():
+            summaries = MonthlySummary.objects.filter(
+                user=user,
+                month=month,
+                year=year,
+                category__type='expense',
+                category__deleted_at__isnull=True,
+            )
+            return summaries.aggregate(total_expense=Sum('total'))['total_expense'] or 0
+
+        today = date.today()
+        loads = [load_budget, load_expense]
+        if forecast.needs_forecast(year, month, today):
+            loads.append(lambda: forecast.load_forecast(user, today))
+        budget_amount, total_expense, *projection = await gather_queries(*loads)
+        projection = projection[0] if projection else forecast.Forecast([])
+
+        return {
             "month": month,
             "year": year,
             "budget": float(budget_amount),
             "actual_expense": float(total_expense),
-            "remaining": float(budget_amount - total_expense)
-        })
-    
-    
+            "remaining": float(budget_amount - total_expense),
+            **projection_fields(
+                budget_amount, projection.project(year, month, total_expense, today)
+            ),
+        }
+
+
+MONTH_PARAMETERS = [
+    openapi.Parameter(
+        'month',
+        openapi.IN_QUERY,
+        description="Month (1-12), defaults to the current month",
+        type=openapi.TYPE_INTEGER
+    ),
+    openapi.Parameter(
+        'year',
+        openapi.IN_QUERY,
+        description="Year, defaults to the current year",
+        type=openapi.TYPE_INTEGER
+    ),
+]
+
+
+class BudgetForecastAPIView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Projected month-end expense against the month's budget, from the "
+            "day-of-month spending curves of the trailing months"
+        ),
+        manual_parameters=MONTH_PARAMETERS,
+        responses={
+            200: openapi.Response(
+                description="Budget forecast",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'month': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'year': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'budget': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'actual_expense': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'projected_expense': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'projected_remaining': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'over_budget': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                        'expected_share': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'trailing_average': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'trailing_months': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    }
+                )
+            ),
+            400: "Invalid month or year",
+            401: "Unauthorized"
+        }
+    )
+    @etag_from_data_version(functools.partial(dated, 'budget-forecast'))
+    @reads_from_replica
+    async def get(self, request):
+        try:
+            year, month = parse_month(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        data = await acached_user_data(
+            request, dated('budget-forecast'), lambda: self.build(request.user, year, month)
+        )
+        return Response(data)
+
+    async def build(self, user, year, month):
+        today = date.today()
+
+        def load_budget():
+            budget = Budget.objects.filter(user=user, month=month, year=year).first()
+            return budget.amount if budget else 0
+
+        def load_expense():
+            summaries = MonthlySummary.objects.filter(
+                user=user,
+                month=month,
+                year=year,
+                category__type='expense',
+                category__deleted_at__isnull=True,
+            )
+            return summaries.aggregate(total_expense=Sum('total'))['total_expense'] or 0
+
+        budget_amount, total_expense, projection = await gather_queries(
+            load_budget, load_expense, lambda: forecast.load_forecast(user, today)
+        )
+        fields = projection_fields(
+            budget_amount, projection.project(year, month, total_expense, today)
+        )
+        if (year, month) == (today.year, today.month):
+            expected_share = projection.expected_share(today.day / forecast.month_days(year, month))
+        else:
+            expected_share = 1.0 if (year, month) < (today.year, today.month) else 0.0
+        return {
+            "month": month,
+            "year": year,
+            "budget": float(budget_amount),
+            "actual_expense": float(total_expense),
+            **fields,
+            "projected_remaining": round(float(budget_amount) - fields['projected_expense'], 2),
+            "expected_share": round(expected_share, 4),
+            "trailing_average": round(projection.average, 2),
+            "trailing_months": len(projection.curves),
+        }
+
+
+class CategoryBudgetAPIView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="List per-category limits for a month",
+        manual_parameters=MONTH_PARAMETERS,
+        responses={
+            200: CategoryBudgetSerializer(many=True),
+            400: "Invalid month or year",
+            401: "Unauthorized"
+        }
+    )
+    @etag_from_data_version(functools.partial(dated, 'category-budgets'))
+    @reads_from_replica
+    async def get(self, request):
+        try:
+            year, month = parse_month(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        limits = CategoryBudget.objects.filter(user=request.user, year=year, month=month)
+        return Response(await category_budget_reader.aread(limits.order_by('category_id')))
+
+    @swagger_auto_schema(
+        operation_description="Set a limit for one expense category in a month",
+        request_body=CategoryBudgetSerializer,
+        responses={
+            201: CategoryBudgetSerializer,
+            400: "Bad request",
+            401: "Unauthorized"
+        }
+    )
+    def post(self, request):
+        serializer = CategoryBudgetSerializer(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            serializer.save(user=request.user)
+            bump_data_version(request.user.id)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class CategoryBudgetDetailAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_object(self, id, user):
+        return get_object_or_404(CategoryBudget, id=id, user=user)
+
+    @swagger_auto_schema(
+        operation_description="Update a category limit",
+        request_body=CategoryBudgetSerializer,
+        responses={
+            200: CategoryBudgetSerializer,
+            400: "Bad request",
+            401: "Unauthorized",
+            404: "Category limit not found"
+        }
+    )
+    def put(self, request, id):
+        limit = self.get_object(id, request.user)
+        serializer = CategoryBudgetSerializer(
+            limit, data=request.data, partial=True, context={'request': request}
+        )
+        if serializer.is_valid():
+            serializer.save()
+            bump_data_version(request.user.id)
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @swagger_auto_schema(
+        operation_description="Delete a category limit",
+        responses={
+            204: "No content",
+            401: "Unauthorized",
+            404: "Category limit not found"
+        }
+    )
+    def delete(self, request, id):
+        limit = self.get_object(id, request.user)
+        limit.delete()
+        bump_data_version(request.user.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class CategoryBudgetSummaryAPIView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Limit, spending and remaining amount for every expense category in a month"
+        ),
+        manual_parameters=MONTH_PARAMETERS,
+        responses={
+            200: openapi.Response(
+                description="Per-category budget summary",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'month': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'year': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'categories': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    'id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                    'name': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'limit': openapi.Schema(type=openapi.TYPE_NUMBER, x_nullable=True),
+                                    'spent': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                    'remaining': openapi.Schema(type=openapi.TYPE_NUMBER, x_nullable=True),
+                                }
+                            )
+                        ),
+                    }
+                )
+            ),
+            400: "Invalid month or year",
+            401: "Unauthorized"
+        }
+    )
+    @etag_from_data_version(functools.partial(dated, 'category-budget-summary'))
+    @reads_from_replica
+    async def get(self, request):
+        try:
+            year, month = parse_month(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        summary = await acached_user_data(
+            request, dated('category-budget-summary'),
+            lambda: self.summarize(request.user, year, month)
+        )
+        return Response(summary)
+
+    async def summarize(self, user, year, month):
+        # Both joins match at most one row per category (unique constraints
+        # on the limit and on the monthly rollup), so this is a single query
+        # however many categories the user has.
+        rows = (
+            Categories.objects.filter(user=user, type='expense')
+            .annotate(
+                month_limit=FilteredRelation(
+                    'categorybudget',
+                    condition=Q(categorybudget__year=year, categorybudget__month=month),
+                ),
+                month_rollup=FilteredRelation(
+                    'monthlysummary',
+                    condition=Q(
+                        monthlysummary__user=user,
+                        monthlysummary__year=year,
+                        monthlysummary__month=month,
+                    ),
+                ),
+            )
+            .values('id', 'name', 'month_limit__amount', 'month_rollup__total')
+            .order_by('name', 'id')
+        )
+
+        categories = []
+        async for row in rows:
+            limit = row['month_limit__amount']
+            spent = row['month_rollup__total'] or 0
+            categories.append({
+                "id": row['id'],
+                "name": row['name'],
+                "limit": None if limit is None else float(limit),
+                "spent": float(spent),
+                "remaining": None if limit is None else float(limit - spent),
+            })
+        return {"month": month, "year": year, "categories": categories}
 
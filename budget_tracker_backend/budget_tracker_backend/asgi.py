@@ -3,6 +3,15 @@ ASGI config for budget_tracker_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The read endpoints (categories, transaction and budget lists, and both
+summaries) are async views, so under an ASGI server a worker keeps serving
+other requests while they wait on the database. To run in this mode:
+
+    CONN_MAX_AGE=0 uvicorn budget_tracker_backend.asgi:application --workers 4
+
+The WSGI entry point keeps working unchanged. Compare the two paths with
+``python manage.py benchmark_concurrency``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
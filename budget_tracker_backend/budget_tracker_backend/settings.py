@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 import dj_database_url
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,7 +52,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -62,6 +65,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Responses of at least this many bytes are compressed, with Brotli when the
+# client accepts it and the brotli package is installed, else gzip.
+COMPRESSION_MIN_LENGTH = int(os.environ.get('COMPRESSION_MIN_LENGTH', 1024))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_HEADERS = ['*']
 CORS_ALLOW_METHODS = ['DELETE', 'GET', 'OPTIONS', 'PATCH', 'POST', 'PUT']
@@ -72,16 +80,39 @@ CORS_ALLOWED_ORIGINS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'api.authentication.CachedJWTAuthentication',
+    ),
+    # MessagePack (Accept: application/msgpack) is offered when the msgpack
+    # package is installed.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        *(['api.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# Token users are cached per process. Saving or deleting a user bumps a
+# version in the shared cache that every worker checks, so all of them
+# reload it at once. A queryset .update() on users sends no signal and can
+# go unnoticed for up to the TTL.
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 60))
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', 1024))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
 }
 
+# Request metrics
+# /metrics/ is served only when METRICS_TOKEN is set. Under gunicorn with
+# several workers, point METRICS_MULTIPROC_DIR at an empty directory that all
+# workers share (wipe it on deploy) so a scrape aggregates every worker.
+
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+
 ROOT_URLCONF = 'budget_tracker_backend.urls'
 
 TEMPLATES = [
@@ -105,13 +136,74 @@ WSGI_APPLICATION = 'budget_tracker_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Under ASGI every request runs its ORM calls on a fresh thread, so
+# persistent connections are never reused; set CONN_MAX_AGE=0 there.
 DATABASES = {
     'default': dj_database_url.config(
         default=os.environ.get('DATABASE_URL'),
-        conn_max_age=600
+        conn_max_age=int(os.environ.get('CONN_MAX_AGE', 600))
     )
 }
 
+# Summary, list and export GETs read from this replica when it is set. A
+# user's reads stay on the primary for REPLICA_STICKY_SECONDS after they
+# write, which should exceed the replication lag.
+if os.environ.get('DATABASE_REPLICA_URL'):
+    DATABASES['replica'] = dj_database_url.config(
+        env='DATABASE_REPLICA_URL',
+        conn_max_age=int(os.environ.get('CONN_MAX_AGE', 600))
+    )
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# locmem is per process; point CACHE_URL at Redis when running more than one
+# gunicorn worker so a write in one worker invalidates reads in the others.
+
+if os.environ.get('CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CACHE_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'budget-tracker',
+            'OPTIONS': {
+                'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 5000)),
+                'CULL_FREQUENCY': int(os.environ.get('CACHE_CULL_FREQUENCY', 3)),
+            },
+        }
+    }
+
+USER_DATA_CACHE_TIMEOUT = int(os.environ.get('USER_DATA_CACHE_TIMEOUT', 600))
+
+# Async views run independent summary queries concurrently on a shared pool
+# of worker threads, each holding its own database connection, so this also
+# caps the extra connections a worker process opens.
+ASYNC_QUERY_WORKERS = int(os.environ.get('ASYNC_QUERY_WORKERS', 4))
+
+
+# Transactions moved out of the hot table by the archive_transactions
+# command live here as one compressed file per user and year. Decoded
+# archives are kept in a per-process LRU of this many files.
+TRANSACTION_ARCHIVE_DIR = os.environ.get('TRANSACTION_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive'))
+TRANSACTION_ARCHIVE_CACHE_SIZE = int(os.environ.get('TRANSACTION_ARCHIVE_CACHE_SIZE', 16))
+
+# The build_schema command writes the OpenAPI schema here; the schema routes
+# serve it from disk and only generate it per request when it is missing.
+OPENAPI_SCHEMA_DIR = os.environ.get('OPENAPI_SCHEMA_DIR', os.path.join(BASE_DIR, 'openapi'))
+
+# Budget forecasts average the day-of-month spending curves of this many
+# trailing months. Each month's curve is cached until a write touches it.
+FORECAST_TRAILING_MONTHS = int(os.environ.get('FORECAST_TRAILING_MONTHS', 6))
+FORECAST_CACHE_TIMEOUT = int(os.environ.get('FORECAST_CACHE_TIMEOUT', 7 * 24 * 3600))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -16,27 +16,14 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework_simplejwt.authentication import JWTAuthentication
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Personal Budget Tracker API",
-        default_version='v1',
-        description="API documentation for budget tracker project",
-        contact=openapi.Contact(email="junaids.khan23@gmail.com"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-    authentication_classes=(JWTAuthentication,),
-)
+from api.metrics import metrics_view
+from api.schema import docs_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include('api.urls')),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('metrics/', metrics_view, name='metrics'),
+    path('swagger/', docs_view('swagger'), name='schema-swagger-ui'),
+    path('swagger<format>/', docs_view('spec'), name='schema-json'),
+    path('redoc/', docs_view('redoc'), name='schema-redoc'),
 ]